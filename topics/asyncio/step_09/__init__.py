@@ -1,2 +1,14 @@
 from . prime_calculator import PrimeCalculator
+from . backends import BACKENDS, PrimeBackend, register_backend
 from . prime_server_async import PrimeServerAsync
+from . prime_server_loop import PrimeServerLoop
+from . prime_protocol import PrimeServerProtocol
+from . prime_streams import PrimeServerStreams
+from . parallel_search import ParallelPrimeSearch
+from . prime_store import PrimeStore
+from . prime_count import PrimeCounter
+from . prime_ring import PrimeRing
+from . seqlock import SeqLockValue, SeqLockTuple
+from . governor import SearchGovernor, GovernorMode
+from . divisor_table import DivisorTable
+from . checkpoint import Checkpointer
@@ -0,0 +1,138 @@
+from step_09.primality import is_prime_fast
+from step_09.divisor_table import DivisorTable
+from step_09.incremental_sieve import IncrementalSieve
+from step_09.segmented_sieve import SegmentedSieve
+from step_09.wheel import WheelCandidates
+
+BACKENDS = {}  # Backend name => PrimeBackend subclass.
+
+
+def register_backend(backend_class):
+    """Class decorator: make a backend selectable by its name."""
+    BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+
+def create_backend(name, divisors=None):
+    if name not in BACKENDS:
+        names = ", ".join(sorted(BACKENDS))
+        raise ValueError(f"Unknown prime backend '{name}' (use: {names}).")
+    return BACKENDS[name](divisors)
+
+
+class PrimeBackend:
+    """A way of finding primes, used by PrimeCalculator.
+
+    Subclasses set name and implement primes_after. state is whatever
+    get_state returned when the search was last checkpointed.
+    """
+
+    name = ""
+
+    def __init__(self, divisors=None):
+        self.divisors = divisors or DivisorTable()  # Primes to divide by.
+
+    def primes_after(self, start, state=None):
+        """Yield every prime greater than start, in order, forever."""
+        raise NotImplementedError
+
+    def is_prime(self, num):
+        return self.divisors.is_prime(num)
+
+    def get_state(self):
+        return {}
+
+
+@register_backend
+class TrialDivisionBackend(PrimeBackend):
+    """Odd numbers, trial divided by the primes up to their square root."""
+
+    name = "trial"
+
+    def primes_after(self, start, state=None):
+        return filter(self.is_prime, self.candidates(start))
+
+    def candidates(self, start):
+        if start < 2:
+            yield 2
+        num = max(start + 1, 3) | 1
+        while True:
+            yield num
+            num = num + 2
+
+
+@register_backend
+class WheelBackend(TrialDivisionBackend):
+    """Trial division of the mod-210 wheel candidates only."""
+
+    name = "wheel"
+
+    def candidates(self, start):
+        return iter(WheelCandidates(start))
+
+
+@register_backend
+class MillerRabinBackend(WheelBackend):
+    """Wheel candidates checked with Miller-Rabin (Baillie-PSW > 2^64)."""
+
+    name = "miller-rabin"
+
+    def is_prime(self, num):
+        return is_prime_fast(num)
+
+
+@register_backend
+class SegmentedSieveBackend(PrimeBackend):
+    """Segmented Sieve of Eratosthenes; resumes in the same segment."""
+
+    name = "sieve"
+
+    def __init__(self, divisors=None):
+        super().__init__(divisors)
+        self.sieve = SegmentedSieve()
+
+    def primes_after(self, start, state=None):
+        low = (state or {}).get("segment_low")
+        return self.sieve.primes_after(start, low)
+
+    def get_state(self):
+        if self.sieve.cursor is None:
+            return {}
+        return {"segment_low": self.sieve.cursor}
+
+
+@register_backend
+class IncrementalSieveBackend(PrimeBackend):
+    """Unbounded incremental sieve; memory grows with pi(sqrt n)."""
+
+    name = "incremental"
+
+    def primes_after(self, start, state=None):
+        return IncrementalSieve().primes_after(start)
+
+
+@register_backend
+class BatchBackend(PrimeBackend):
+    """NumPy trial division of BATCH_SIZE odd candidates at a time."""
+
+    name = "batch"
+    BATCH_SIZE = 4096
+
+    def __init__(self, divisors=None):
+        super().__init__(divisors)
+        self.batch = None  # BatchPrimality, made on demand: needs NumPy.
+
+    def primes_after(self, start, state=None):
+        if self.batch is None:
+            # Imported here, so only this backend ever loads NumPy.
+            from step_09.batch_primality import BatchPrimality
+            self.batch = BatchPrimality()
+
+        if start < 2:
+            yield 2
+        low = max(start + 1, 3) | 1
+        while True:
+            high = low + 2 * self.BATCH_SIZE
+            for prime in self.batch.primes_between(low, high, 2):
+                yield int(prime)
+            low = high
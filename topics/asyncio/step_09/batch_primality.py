@@ -0,0 +1,58 @@
+from step_09.primality import is_prime_fast
+from step_09.segmented_sieve import SegmentedSieve
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: only batch checks need it.
+    np = None
+
+
+class BatchPrimality:
+    """Trial division of many candidates at once with NumPy.
+
+    Candidates are divided by a chunk of small primes per step through
+    broadcasting, so the interpreter runs once per chunk instead of once
+    per divisor. Candidates whose square root is beyond the divisor
+    table are handed to the scalar fast test instead.
+    """
+
+    DIVISOR_LIMIT = 1 << 20  # Covers candidates below 2^40.
+    CHUNK_SIZE = 256         # Divisors per broadcast step.
+
+    def __init__(self, divisor_limit=DIVISOR_LIMIT):
+        if np is None:
+            raise RuntimeError("NumPy is needed for batch primality checks.")
+        sieve = SegmentedSieve()
+        self.divisors = np.fromiter(sieve.primes_between(2, divisor_limit),
+                                    dtype=np.int64)
+        self.max_candidate = divisor_limit ** 2
+
+    def is_prime_batch(self, candidates):
+        """Return a boolean mask: True where the candidate is prime."""
+        candidates = np.asarray(candidates, dtype=np.int64)
+        mask = candidates >= 2
+        in_table = candidates < self.max_candidate
+
+        alive = np.flatnonzero(mask & in_table)
+        for start in range(0, len(self.divisors), self.CHUNK_SIZE):
+            if len(alive) == 0:
+                break
+            chunk = self.divisors[start:start + self.CHUNK_SIZE]
+            values = candidates[alive]
+            if chunk[0] * chunk[0] > values.max():
+                break
+
+            divides = (values[:, None] % chunk[None, :] == 0) & \
+                (chunk[None, :] * chunk[None, :] <= values[:, None])
+            composite = divides.any(axis=1)
+            mask[alive[composite]] = False
+            alive = alive[~composite]
+
+        for i in np.flatnonzero(mask & ~in_table):
+            mask[i] = is_prime_fast(int(candidates[i]))
+        return mask
+
+    def primes_between(self, low, high, step=1):
+        """Array of the primes p in range(low, high, step)."""
+        candidates = np.arange(low, high, step, dtype=np.int64)
+        return candidates[self.is_prime_batch(candidates)]
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Benchmark harness: runs every registered prime backend (or those named
+# on the command line) over the same ranges and reports primes/s, peak RSS
+# and time to the first prime. Each backend runs in a fresh process so
+# that its peak RSS is its own.
+#
+# Run from step_09 after: source ./setup.sh
+#   python benchmarks/bench_backends.py [backend ...]
+#
+import multiprocessing
+import resource
+import sys
+import time
+from step_09 import BACKENDS
+from step_09.backends import create_backend
+
+RANGES = (
+    (10 ** 6, 2 * 10 ** 6),
+    (10 ** 9, 10 ** 9 + 10 ** 5),
+    (10 ** 12, 10 ** 12 + 10 ** 4),
+)
+
+
+def count_primes(backend, low, high):
+    count = 0
+    for prime in backend.primes_after(low - 1):
+        if prime >= high:
+            break
+        count += 1
+    return count
+
+
+def run_backend(name, results):
+    """Runs in its own process; puts one result row on the queue."""
+    try:
+        start = time.perf_counter()
+        backend = create_backend(name)
+        next(backend.primes_after(RANGES[0][0]))
+        first_prime_time = time.perf_counter() - start
+
+        rates = []
+        for low, high in RANGES:
+            start = time.perf_counter()
+            count = count_primes(backend, low, high)
+            rates.append(count / (time.perf_counter() - start))
+
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB
+        results.put((name, first_prime_time, rates, peak_rss, None))
+
+    except Exception as e:
+        results.put((name, None, None, None, str(e)))
+
+
+def run_in_process(context, name):
+    results = context.Queue()
+    process = context.Process(target=run_backend, args=(name, results))
+    process.start()
+    row = results.get()
+    process.join()
+    return row
+
+
+def print_header():
+    range_titles = [f"~10^{len(str(low)) - 1} p/s" for low, _ in RANGES]
+    print(f"{'backend':<14} {'first prime':>12}"
+          + "".join(f" {title:>14}" for title in range_titles)
+          + f" {'peak RSS':>10}")
+
+
+def print_row(row):
+    name, first_prime_time, rates, peak_rss, error = row
+    if error is not None:
+        print(f"{name:<14} failed: {error}")
+        return
+    print(f"{name:<14} {first_prime_time * 1000:>9.1f} ms"
+          + "".join(f" {rate:>14,.0f}" for rate in rates)
+          + f" {peak_rss / 1024:>7.1f} MB")
+
+
+def main():
+    names = sys.argv[1:] or sorted(BACKENDS)
+    context = multiprocessing.get_context("spawn")  # Clean processes.
+
+    print_header()
+    for name in names:
+        print_row(run_in_process(context, name))
+
+
+if __name__ == "__main__":
+    main()
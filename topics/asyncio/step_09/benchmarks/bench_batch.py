@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+# Benchmark: candidates per second for scalar trial division, the scalar
+# fast test and NumPy batch trial division.
+#
+# Run from step_09 after: source ./setup.sh  (needs NumPy)
+#
+import time
+from step_09 import PrimeCalculator
+from step_09.batch_primality import BatchPrimality
+
+MAGNITUDES = (6, 9, 12)
+CANDIDATES = 20000  # Odd numbers tested per magnitude.
+TRIAL_MAX_MAGNITUDE = 9  # Beyond this trial division takes minutes.
+
+
+def time_scalar(calculator, candidates):
+    start = time.perf_counter()
+    found = sum(1 for num in candidates if calculator.is_prime(num))
+    return found, len(candidates) / (time.perf_counter() - start)
+
+
+def time_batch(batch, candidates):
+    start = time.perf_counter()
+    found = int(batch.is_prime_batch(candidates).sum())
+    return found, len(candidates) / (time.perf_counter() - start)
+
+
+def main():
+    trial = PrimeCalculator("trial")
+    fast = PrimeCalculator("miller-rabin")
+    batch = BatchPrimality()
+
+    print(f"{'n ~':>6} {'trial division':>16} {'miller-rabin':>14}"
+          f" {'numpy batch':>14}   (candidates/s)")
+    for magnitude in MAGNITUDES:
+        low = 10 ** magnitude + 1
+        candidates = list(range(low, low + 2 * CANDIDATES, 2))
+
+        trial_rate = "-"
+        if magnitude <= TRIAL_MAX_MAGNITUDE:
+            _, rate = time_scalar(trial, candidates)
+            trial_rate = f"{rate:,.0f}"
+        fast_found, fast_rate = time_scalar(fast, candidates)
+        batch_found, batch_rate = time_batch(batch, candidates)
+        assert fast_found == batch_found
+
+        print(f"{'10^' + str(magnitude):>6} {trial_rate:>16}"
+              f" {fast_rate:>14,.0f} {batch_rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+# Benchmark: pushing new primes to many subscribers, with each slow
+# consumer policy. A server runs in this process with SUBSCRIBERS
+# subscribed clients, of which SLOW_SHARE never read, while primes are
+# added to the ring at RATE per second. Reports the fan-out latency
+# percentiles, updates dropped, and what the readers received.
+#
+# Run from step_09 after: source ./setup.sh
+#   python benchmarks/bench_fanout.py [server mode]
+#
+import asyncio
+import contextlib
+import io
+import socket
+import sys
+import time
+from step_09 import PrimeRing, PrimeServerAsync, PrimeServerProtocol
+from step_09 import PrimeServerStreams
+from step_09 import globals
+from step_09.prime_feed import SLOW_CONSUMER_POLICIES
+from step_09.segmented_sieve import SegmentedSieve
+
+HOST, PORT = "localhost", 50007
+SUBSCRIBERS = 200
+SLOW_SHARE = 0.05  # Subscribers that never read.
+SLOW_BUFFER = 4096  # Receive buffer of the slow subscribers, in bytes.
+RATE = 100000      # Primes per second.
+DURATION = 6.0     # Seconds of primes.
+SERVERS = {
+    "coroutine": PrimeServerAsync,
+    "protocol": PrimeServerProtocol,
+    "streams": PrimeServerStreams,
+}
+
+
+async def subscribe(receive_buffer=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if receive_buffer is not None:  # Fills up soon when not read.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, (HOST, PORT))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    writer.write(b'subscribe')
+    await reader.readexactly(4)
+    return reader, writer
+
+
+async def read_pushes(reader):
+    """Count the pushes read until the server goes away."""
+    received = 0
+    try:
+        while data := await reader.read(65536):
+            received += len(data)
+    except ConnectionError:
+        pass
+    return received // 8  # Sequence number and prime: 4 bytes each.
+
+
+async def publish_primes():
+    primes = SegmentedSieve().primes_after(10 ** 6)
+    start = time.perf_counter()
+    published = 0
+    while time.perf_counter() - start < DURATION:
+        due = int((time.perf_counter() - start) * RATE)
+        for _ in range(due - published):
+            globals.ring.append(next(primes))
+        published = due
+        await asyncio.sleep(0.001)
+    return published
+
+
+async def bench_policy(server_class, policy):
+    server = server_class()
+    server.set_feed_policy(policy)
+    server_task = asyncio.create_task(server.run())
+    await asyncio.sleep(0.1)
+
+    slow_count = int(SUBSCRIBERS * SLOW_SHARE)
+    connections = [await subscribe(SLOW_BUFFER) for _ in range(slow_count)]
+    connections += [await subscribe()
+                    for _ in range(SUBSCRIBERS - slow_count)]
+    readers = [asyncio.create_task(read_pushes(reader))
+               for reader, _ in connections[slow_count:]]
+    published = await publish_primes()
+    await asyncio.sleep(0.5)
+
+    percentiles = server.feed.get_latency_percentiles()
+    dropped = server.feed.dropped
+    subscribed = len(server.feed.subscribers)
+    server.cancel()
+    server_task.cancel()
+    for _, writer in connections:
+        writer.close()
+    received = await asyncio.gather(*readers)
+    await asyncio.gather(server_task, return_exceptions=True)
+    return percentiles, dropped, subscribed, sum(received) / len(received), \
+        published
+
+
+def print_row(policy, row):
+    percentiles, dropped, subscribed, received, published = row
+    latencies = " ".join(f"{seconds * 1000:>8.2f}"
+                         for seconds in percentiles.values())
+    print(f"{policy:<12} {latencies} {dropped:>9,} {subscribed:>11,}"
+          f" {received / published:>9.0%}")
+
+
+async def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "protocol"
+    globals.ring = PrimeRing()
+    print(f"{SUBSCRIBERS} subscribers ({SLOW_SHARE:.0%} never read), "
+          f"{RATE} primes/s, {mode} server.")
+    print(f"{'policy':<12} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}"
+          f" {'dropped':>9} {'subscribed':>11} {'received':>9}")
+    try:
+        for policy in SLOW_CONSUMER_POLICIES:
+            with contextlib.redirect_stdout(io.StringIO()):  # Server logs.
+                row = await bench_policy(SERVERS[mode], policy)
+            print_row(policy, row)
+    finally:
+        globals.ring.close()
+        globals.ring.unlink()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
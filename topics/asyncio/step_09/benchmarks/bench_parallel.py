@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# Benchmark: scaling of the parallel sieve search from 1 to N workers,
+# without a store and then recording into a fresh one.
+#
+# Run from step_09 after: source ./setup.sh
+#
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Value
+from step_09 import ParallelPrimeSearch, PrimeStore, SeqLockValue
+from step_09 import globals
+
+LIMIT = 2 * 10 ** 8  # Sieve every number up to here.
+
+
+def get_worker_counts(max_workers):
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers = workers * 2
+    counts.append(max_workers)
+    return counts
+
+
+async def time_search(workers, store=None):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        search = ParallelPrimeSearch(pool, workers, store=store)
+        start = time.perf_counter()
+        await search.run(LIMIT)
+        elapsed = time.perf_counter() - start
+    return search.primes_found, elapsed
+
+
+async def time_search_with_store(workers):
+    with tempfile.TemporaryDirectory() as directory:
+        store = PrimeStore(os.path.join(directory, "primes.store"))
+        store.open(writable=True)
+        try:
+            _, elapsed = await time_search(workers, store)
+        finally:
+            store.close()
+    return elapsed
+
+
+async def main():
+    globals.prime = SeqLockValue('Q', 0)
+    globals.running = Value('B', 1)
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+
+    results = []
+    for workers in get_worker_counts(max_workers):
+        results.append((workers, *await time_search(workers),
+                        await time_search_with_store(workers)))
+
+    base_time = results[0][2]
+    print(f"\nSieving up to {LIMIT:,}:")
+    print(f"{'workers':>8} {'primes':>12} {'seconds':>9} {'speedup':>8}"
+          f" {'efficiency':>11} {'with store':>11}")
+    for workers, primes_found, elapsed, store_elapsed in results:
+        speedup = base_time / elapsed
+        print(f"{workers:>8} {primes_found:>12,} {elapsed:>9.2f}"
+              f" {speedup:>7.2f}x {speedup / workers:>10.0%}"
+              f" {store_elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
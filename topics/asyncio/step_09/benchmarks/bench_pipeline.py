@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# Benchmark: get requests per second over one connection, with the text
+# protocol (one round trip per request) and with the binary protocol at
+# several pipeline depths (requests sent before waiting for replies).
+#
+# Run from step_09 after: source ./setup.sh
+# with ./prime_app.py running, then:
+#   python benchmarks/bench_pipeline.py [depth ...]
+#
+import socket
+import sys
+import time
+from step_09.prime_server_async import OPCODES
+from step_09.wire import FrameParser, encode_frame, read_int
+
+ADDRESS = ("localhost", 50007)
+REQUESTS = 50000
+DEPTHS = (1, 64)
+GET_OPCODE = next(op for op, name in OPCODES.items() if name == b'get')
+
+
+def recv_exactly(connection, length):
+    data = b''
+    while len(data) < length:
+        packet = connection.recv(length - len(data))
+        if not packet:
+            raise ConnectionError("Server closed the connection.")
+        data += packet
+    return data
+
+
+def time_text():
+    with socket.create_connection(ADDRESS) as connection:
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            connection.sendall(b'get')
+            read_int(lambda length: recv_exactly(connection, length))
+        return time.perf_counter() - start
+
+
+def time_frames(depth):
+    request = encode_frame(GET_OPCODE, []) * depth
+    parser = FrameParser()
+    with socket.create_connection(ADDRESS) as connection:
+        start = time.perf_counter()
+        for _ in range(REQUESTS // depth):
+            connection.sendall(request)
+            replies = 0
+            while replies < depth:
+                parser.feed(connection.recv(65536))
+                replies += len(parser.parse())
+        return time.perf_counter() - start
+
+
+def print_rate(title, elapsed, requests=REQUESTS):
+    print(f"{title:<20} {requests / elapsed:>12,.0f} req/s")
+
+
+def main():
+    depths = [int(arg) for arg in sys.argv[1:]] or DEPTHS
+
+    print_rate("text", time_text())
+    for depth in depths:
+        requests = REQUESTS // depth * depth
+        print_rate(f"frames, depth {depth}", time_frames(depth), requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# Benchmark: trial division vs Miller-Rabin/BPSW for single-number checks.
+#
+# Run from step_09 after: source ./setup.sh
+#
+import time
+from step_09 import PrimeCalculator
+
+MAGNITUDES = (6, 8, 10, 12, 14, 18, 30, 60)
+TRIAL_MAX_MAGNITUDE = 12  # Beyond this trial division takes minutes.
+PRIMES_PER_MAGNITUDE = 5
+
+
+def first_primes_from(num, count):
+    calculator = PrimeCalculator("miller-rabin")
+    primes = []
+    num = num | 1
+    while len(primes) < count:
+        if calculator.is_prime(num):
+            primes.append(num)
+        num = num + 2
+    return primes
+
+
+def time_checks(calculator, primes):
+    start = time.perf_counter()
+    for p in primes:
+        assert calculator.is_prime(p)
+    return (time.perf_counter() - start) / len(primes)
+
+
+def format_time(seconds):
+    if seconds is None:
+        return "-"
+    return f"{seconds * 1e6:,.1f} us"
+
+
+def main():
+    trial = PrimeCalculator("trial")
+    fast = PrimeCalculator("miller-rabin")
+
+    print(f"{'n ~':>8} {'trial division':>18} {'miller-rabin':>16}")
+    for magnitude in MAGNITUDES:
+        primes = first_primes_from(10 ** magnitude, PRIMES_PER_MAGNITUDE)
+
+        trial_time = None
+        if magnitude <= TRIAL_MAX_MAGNITUDE:
+            trial_time = time_checks(trial, primes)
+        fast_time = time_checks(fast, primes)
+
+        print(f"{'10^' + str(magnitude):>8} {format_time(trial_time):>18} "
+              f"{format_time(fast_time):>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# Benchmark: reading the latest prime through Value.get_lock() vs a seqlock,
+# with and without a writer process publishing at the same time.
+#
+# Run from step_09 after: source ./setup.sh
+#
+import time
+from multiprocessing import Process, Value
+from step_09 import SeqLockValue
+
+READS = 500_000
+
+
+def write_locked(shared, running):
+    num = 0
+    while running.value == 1:
+        num = num + 1
+        with shared.get_lock():
+            shared.value = num
+
+
+def write_seqlock(shared, running):
+    num = 0
+    while running.value == 1:
+        num = num + 1
+        shared.write(num)
+
+
+def read_locked(shared):
+    with shared.get_lock():
+        return shared.value
+
+
+def read_seqlock(shared):
+    return shared.read()
+
+
+def time_reads(read, shared):
+    start = time.perf_counter()
+    for _ in range(READS):
+        read(shared)
+    return READS / (time.perf_counter() - start)
+
+
+def time_reads_with_writer(read, write, shared):
+    running = Value('B', 1)
+    writer = Process(target=write, args=(shared, running))
+    writer.start()
+    time.sleep(0.2)  # Let the writer get going.
+    rate = time_reads(read, shared)
+    running.value = 0
+    writer.join()
+    return rate
+
+
+def main():
+    cases = (
+        ("Value + get_lock()", read_locked, write_locked, Value('Q', 0)),
+        ("SeqLockValue", read_seqlock, write_seqlock, SeqLockValue('Q', 0)),
+    )
+
+    print(f"{'primitive':<20} {'reads/s idle':>14} {'reads/s + writer':>18}")
+    for name, read, write, shared in cases:
+        idle = time_reads(read, shared)
+        busy = time_reads_with_writer(read, write, shared)
+        print(f"{name:<20} {idle:>14,.0f} {busy:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
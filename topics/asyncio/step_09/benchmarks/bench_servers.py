@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+# Benchmark: the server modes of prime_app.py (--server) compared on
+# requests per second, with CLIENTS clients each sending get and
+# waiting for the answer, and on server memory per idle connection.
+# Memory is read from /proc, so this runs on Linux only.
+#
+# Run from step_09 after: source ./setup.sh
+#   python benchmarks/bench_servers.py [mode ...]
+#
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_PATH = os.path.join(os.path.dirname(__file__), "..", "prime_app.py")
+HOST, PORT = "localhost", 50007
+MODES = ("coroutine", "protocol", "streams")
+CLIENTS = 32
+DURATION = 5.0            # Seconds of requests per mode.
+IDLE_CONNECTIONS = 1000   # Opened to measure memory per connection.
+
+
+async def wait_until_ready():
+    for _ in range(1000):
+        try:
+            reader, writer = await asyncio.open_connection(HOST, PORT)
+        except OSError:
+            await asyncio.sleep(0.01)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return
+    raise RuntimeError("The server did not start.")
+
+
+async def run_client(deadline):
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    requests = 0
+    while time.perf_counter() < deadline:
+        writer.write(b'get')
+        await reader.readexactly(4)
+        requests += 1
+    writer.close()
+    await writer.wait_closed()
+    return requests
+
+
+async def time_requests():
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(run_client(start + DURATION)
+                                    for _ in range(CLIENTS)))
+    return sum(counts) / (time.perf_counter() - start)
+
+
+async def open_idle_connection():
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write(b'get')
+    await reader.readexactly(4)
+    return writer
+
+
+def get_rss(pid):
+    """Resident set size in KiB."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def measure_connection_memory(pid):
+    await asyncio.sleep(0.5)
+    before = get_rss(pid)
+    writers = [await open_idle_connection()
+               for _ in range(IDLE_CONNECTIONS)]
+    await asyncio.sleep(0.5)
+    after = get_rss(pid)
+    for writer in writers:
+        writer.close()
+    return (after - before) * 1024 / IDLE_CONNECTIONS
+
+
+async def bench_mode(mode):
+    with tempfile.TemporaryDirectory() as directory:
+        app = subprocess.Popen([sys.executable, APP_PATH, "--server", mode],
+                               cwd=directory, stdout=subprocess.DEVNULL)
+        try:
+            await wait_until_ready()
+            rate = await time_requests()
+            memory = await measure_connection_memory(app.pid)
+        finally:
+            app.send_signal(signal.SIGINT)
+            app.wait()
+    return rate, memory
+
+
+def main():
+    modes = sys.argv[1:] or MODES
+
+    print(f"{'server':<10} {'req/s':>10} {'bytes/connection':>18}")
+    for mode in modes:
+        rate, memory = asyncio.run(bench_mode(mode))
+        print(f"{mode:<10} {rate:>10,.0f} {memory:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Benchmark: time to ready of prime_app.py, cold (no store) and warm (a
+# store prebuilt by build_store.py). Ready means the server answers get
+# with a prime, and nth with the NTH-th prime.
+#
+# Run from step_09 after: source ./setup.sh
+#   python benchmarks/bench_startup.py [primes to prebuild]
+#
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from step_09.build_store import build_store
+
+APP_PATH = os.path.join(os.path.dirname(__file__), "..", "prime_app.py")
+ADDRESS = ("localhost", 50007)
+PRIMES = 10 ** 7  # Prebuilt for the warm start.
+NTH = 10 ** 6     # The nth query that must be answered.
+TIMEOUT = 10.0    # Seconds to wait for each answer.
+
+
+def ask(message):
+    """One query on a new connection: the 4 byte answer, or None."""
+    try:
+        with socket.create_connection(ADDRESS, timeout=1.0) as connection:
+            connection.sendall(message)
+            data = connection.recv(4)
+    except OSError:
+        return None
+    return int.from_bytes(data, 'big') if len(data) == 4 else None
+
+
+def wait_for(message, start):
+    """Seconds from start until message gets a non-zero answer."""
+    while time.perf_counter() - start < TIMEOUT:
+        if ask(message):
+            return time.perf_counter() - start
+        time.sleep(0.001)
+    return None
+
+
+def time_startup(directory):
+    start = time.perf_counter()
+    app = subprocess.Popen([sys.executable, APP_PATH], cwd=directory,
+                           stdout=subprocess.DEVNULL)
+    try:
+        get_time = wait_for(b"get", start)
+        nth_time = wait_for(f"nth {NTH}".encode(), start)
+    finally:
+        app.send_signal(signal.SIGINT)
+        app.wait()
+    return get_time, nth_time
+
+
+def format_time(seconds):
+    if seconds is None:
+        return f"> {TIMEOUT:.0f} s"
+    return f"{seconds * 1000:.0f} ms"
+
+
+def main():
+    primes = int(sys.argv[1]) if len(sys.argv) > 1 else PRIMES
+
+    print(f"{'start':<6} {'get':>10} {f'nth {NTH}':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        get_time, nth_time = time_startup(directory)
+        print(f"{'cold':<6} {format_time(get_time):>10} "
+              f"{format_time(nth_time):>12}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_store(os.path.join(directory, "primes.store"), primes)
+        get_time, nth_time = time_startup(directory)
+        print(f"{'warm':<6} {format_time(get_time):>10} "
+              f"{format_time(nth_time):>12}")
+
+
+if __name__ == "__main__":
+    main()
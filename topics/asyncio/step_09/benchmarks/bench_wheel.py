@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# Benchmark: mod-210 wheel candidates vs stepping over odd numbers.
+#
+# Run from step_09 after: source ./setup.sh
+#
+import time
+from step_09 import PrimeCalculator, SeqLockValue
+from step_09 import globals
+from step_09.wheel import WheelCandidates
+
+START = 10 ** 7
+SPAN = 2 * 10 ** 6     # Numbers covered by the candidate count.
+PRIMES_TO_FIND = 2000  # Primes found by each backend.
+
+
+def odd_candidates(start, stop):
+    num = start | 1
+    while num < stop:
+        yield num
+        num = num + 2
+
+
+def time_candidates(candidates):
+    start = time.perf_counter()
+    count = sum(1 for _ in candidates)
+    return count, time.perf_counter() - start
+
+
+def time_search(backend):
+    calculator = PrimeCalculator(backend)
+    calculator.current_prime = START + 1
+
+    start = time.perf_counter()
+    for _ in range(PRIMES_TO_FIND):
+        calculator.find_next()
+    return calculator.get_latest(), time.perf_counter() - start
+
+
+def main():
+    globals.prime = SeqLockValue('Q', 0)
+
+    print(f"Candidates in [{START}, {START + SPAN}):")
+    odd_count, odd_time = time_candidates(odd_candidates(START, START + SPAN))
+    wheel_count, wheel_time = time_candidates(
+        WheelCandidates(START, START + SPAN))
+    print(f"  odd stepping: {odd_count:>9,} in {odd_time:.3f}s")
+    print(f"  wheel:        {wheel_count:>9,} in {wheel_time:.3f}s"
+          f" ({1 - wheel_count / odd_count:.0%} fewer than odd stepping,"
+          f" {1 - wheel_count / SPAN:.0%} of all numbers skipped)")
+
+    print(f"\nFinding {PRIMES_TO_FIND} primes after {START}:")
+    for backend in ("trial", "wheel"):
+        latest, elapsed = time_search(backend)
+        print(f"  {backend:<15} {elapsed:.3f}s (last prime {latest})")
+
+
+if __name__ == "__main__":
+    main()
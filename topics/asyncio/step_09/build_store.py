@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+# Builds primes.store ahead of time, so the server starts warm: get, nth,
+# pi, isprime and range are answered from the table at once, and the
+# search carries on from its last prime.
+#
+# Type:
+#   ./build_store.py [--primes N] [--path primes.store]
+#
+# Stop the server first: the store is replaced.
+#
+import argparse
+import math
+import os
+import time
+
+from step_09 import PrimeStore
+from step_09.prime_store import pack_bits
+from step_09.segmented_sieve import SegmentedSieve
+
+PRIMES = 10 ** 8  # Up to 2,038,074,743: a 122 MiB table.
+SEGMENT_SIZE = 1 << 20  # Odd numbers per segment; a multiple of 8.
+
+
+def get_limit(primes):
+    """A bound above the nth prime (Rosser's theorem, n >= 6)."""
+    n = max(primes, 6)
+    return int(n * (math.log(n) + math.log(math.log(n)))) + 1
+
+
+def find_last(flags, rank):
+    """Index of the rank-th 1 in flags (rank from 1)."""
+    index = -1
+    for _ in range(rank):
+        index = flags.index(1, index + 1)
+    return index
+
+
+def write_store(file, primes):
+    """Write the bitset of the first primes primes; return the last one."""
+    sieve = SegmentedSieve(SEGMENT_SIZE)
+    limit = get_limit(primes)
+    found = 1  # The prime 2 is implied by the store.
+    low = 1
+    while low < limit:
+        high = low + 2 * SEGMENT_SIZE
+        flags = sieve.segment_flags(low, high)
+        if low == 1:
+            flags[0] = 0  # The number 1.
+
+        count = flags.count(1)
+        if found + count >= primes:
+            last = find_last(flags, primes - found)
+            del flags[last + 1:]
+            flags.extend(bytes(-len(flags) % 8))
+            file.write(pack_bits(flags))
+            return low + 2 * last
+
+        file.write(pack_bits(flags))
+        found += count
+        low = high
+
+    raise AssertionError("The limit is below the last prime.")
+
+
+def build_store(path, primes):
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(PrimeStore.HEADER.pack(PrimeStore.MAGIC, 1))
+        highest = write_store(file, primes)
+
+        size = file.tell() - PrimeStore.HEADER.size
+        size += -size % PrimeStore.GROW_BYTES  # Room for the search.
+        file.truncate(PrimeStore.HEADER.size + size)
+        file.seek(0)
+        file.write(PrimeStore.HEADER.pack(PrimeStore.MAGIC, highest))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+    return highest
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build a prime store.")
+    parser.add_argument("--primes", type=int, default=PRIMES,
+                        help="how many primes to store")
+    parser.add_argument("--path", default="primes.store",
+                        help="the store to replace")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    highest = build_store(args.path, max(args.primes, 2))
+    print(f"{args.path}: {args.primes:,} primes up to {highest:,} "
+          f"in {time.perf_counter() - start:.1f} s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import json
+import os
+import time
+import zlib
+
+
+class Checkpointer:
+    """Periodic, crash-safe snapshots of the prime search state.
+
+    Each checkpoint is a numbered JSON file holding the state and a CRC
+    of it. It is written to a temporary file, flushed to disk and then
+    renamed into place, so a crash leaves either the old or the new
+    checkpoint but never half of one. Restoring takes the newest file
+    whose CRC checks out.
+    """
+
+    INTERVAL = 10.0  # Seconds between checkpoints.
+    KEEP = 3         # Older checkpoints are deleted.
+    PREFIX = "checkpoint-"
+    SUFFIX = ".json"
+
+    def __init__(self, directory, interval=INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.last_save = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+
+    def is_due(self):
+        return time.monotonic() - self.last_save >= self.interval
+
+    def save(self, state):
+        numbers = self.get_numbers()
+        number = numbers[-1] + 1 if numbers else 1
+        path = self.get_path(number)
+
+        body = json.dumps(state, sort_keys=True)
+        record = {"crc": zlib.crc32(body.encode()), "state": state}
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(record, file, sort_keys=True)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        self.sync_directory()
+
+        self.last_save = time.monotonic()
+        self.remove_old(numbers + [number])
+
+    def save_search(self, state, store=None):
+        """Save a search's state. Its store, if any, is flushed first, so
+        a checkpoint is never ahead of the primes on disk."""
+        if store is not None:
+            store.flush()
+        self.save(state)
+
+    def save_search_if_due(self, get_state, store=None):
+        if self.is_due():
+            self.save_search(get_state(), store)
+
+    @staticmethod
+    def can_resume(state, latest, store=None):
+        """Whether a search at latest should take up state: only if that
+        moves it forward, and never past the store's highest prime."""
+        prime = state["current_prime"]
+        if store is not None and prime > store.highest_prime():
+            print("Checkpoint is ahead of the store: resuming from the store.")
+            return False
+        return prime >= latest
+
+    def sync_directory(self):
+        """Make the rename itself durable."""
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def load_latest(self):
+        """The newest valid state, or None if there is none."""
+        for number in reversed(self.get_numbers()):
+            state = self.load(self.get_path(number))
+            if state is not None:
+                return state
+        return None
+
+    def load(self, path):
+        try:
+            with open(path) as file:
+                record = json.load(file)
+            state = record["state"]
+            body = json.dumps(state, sort_keys=True)
+            if zlib.crc32(body.encode()) == record["crc"]:
+                return state
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        print(f"Ignoring damaged checkpoint: {path}")
+        return None
+
+    def get_numbers(self):
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(self.PREFIX) and name.endswith(self.SUFFIX):
+                number = name[len(self.PREFIX):-len(self.SUFFIX)]
+                if number.isdigit():
+                    numbers.append(int(number))
+        return sorted(numbers)
+
+    def get_path(self, number):
+        name = f"{self.PREFIX}{number:08d}{self.SUFFIX}"
+        return os.path.join(self.directory, name)
+
+    def remove_old(self, numbers):
+        for number in numbers[:-self.KEEP]:
+            try:
+                os.remove(self.get_path(number))
+            except FileNotFoundError:
+                pass
@@ -2,6 +2,7 @@
 # Echo client program
 import socket
 import time
+from step_09.wire import read_int
 
 
 class PrimeClient:
@@ -36,10 +37,47 @@ class PrimeClient:
 
     def get_prime(self):
         self.socket.sendall(b'get')
-        data: bytes = self.socket.recv(4)  # Get value
-        value: int = int.from_bytes(data, 'big')
+        value: int = read_int(self.recv_exactly)
         return value
 
+    def get_recent_primes(self, count):
+        """The count latest primes, oldest first, in one round trip.
+
+        Fewer come back if the server does not have that many.
+        """
+        self.socket.sendall(f"getn {count}".encode())
+        length = read_int(self.recv_exactly)
+        return [read_int(self.recv_exactly) for _ in range(length)]
+
+    def subscribe(self):
+        """Yield (sequence number, prime) for each prime found from now on.
+
+        A sequence number that jumps means primes were missed.
+        """
+        self.socket.sendall(b'subscribe')
+        read_int(self.recv_exactly)  # The first sequence number.
+        while True:
+            seq = read_int(self.recv_exactly)
+            yield seq, read_int(self.recv_exactly)
+
+    def get_primes_between(self, low, high):
+        """Yield the primes in [low, high) as the server streams them."""
+        self.socket.sendall(f"range {low} {high}".encode())
+        while True:
+            value = read_int(self.recv_exactly)
+            if value == 0:  # End of the range.
+                break
+            yield value
+
+    def recv_exactly(self, length):
+        data = b''
+        while len(data) < length:
+            packet = self.socket.recv(length - len(data))
+            if not packet:
+                raise ConnectionError("Server closed the connection.")
+            data += packet
+        return data
+
     def clean_up(self):
         self.close_socket()
 
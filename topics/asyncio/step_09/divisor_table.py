@@ -0,0 +1,107 @@
+import math
+from array import array
+from multiprocessing import shared_memory
+from step_09.segmented_sieve import SegmentedSieve
+
+
+class DivisorTable:
+    """Odd primes for trial division, in a compact array('I').
+
+    The table grows on demand, a range at a time, until it holds every
+    prime up to sqrt of the largest number tested. It stops growing at
+    MAX_PRIMES; larger numbers go on to odd divisors after the table.
+
+    share() copies the table into shared memory. Pool workers read the
+    shared copy in place and only make a private copy if they need to
+    grow it. A shared table pickles as the name of its memory, so pool
+    processes started by spawn or forkserver attach to it too.
+    """
+
+    MAX_PRIMES = 1 << 20  # 4 MiB, enough for numbers up to about 2.7e14.
+
+    def __init__(self, max_primes=MAX_PRIMES):
+        self.max_primes = max_primes
+        self.primes = array('I', [3])
+        self.limit = 3  # Every odd prime <= limit is in the table.
+        self.memory = None  # SharedMemory, when the table is shared.
+
+    def ensure(self, limit):
+        """Grow the table until it holds every odd prime <= limit."""
+        while self.limit < limit and len(self.primes) < self.max_primes:
+            self.grow(max(limit, 2 * self.limit))
+
+    def grow(self, limit):
+        if not isinstance(self.primes, array):
+            self.primes = array('I', self.primes)  # Private copy.
+
+        room = self.max_primes - len(self.primes)
+        new_primes = SegmentedSieve().primes_between(self.limit + 1, limit + 1)
+        for prime in new_primes:
+            if room == 0:
+                limit = self.primes[-1]  # Full: stop at the last prime.
+                break
+            self.primes.append(prime)
+            room -= 1
+        self.limit = limit
+
+    def is_prime(self, num):
+        if num < 3 or num % 2 == 0:
+            return num == 2
+
+        max_divisor = math.isqrt(num)
+        self.ensure(max_divisor)
+        for p in self.primes:
+            if p > max_divisor:
+                return True
+            if num % p == 0:
+                return num == p
+
+        for i in range((self.limit + 1) | 1, max_divisor + 1, 2):
+            if num % i == 0:
+                return False
+        return True
+
+    def share(self):
+        """Return a read-only copy of this table in shared memory."""
+        size = max(self.primes.itemsize * len(self.primes), 1)
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        view = memory.buf[:size].cast('I')
+        view[:] = self.primes
+        view.release()
+
+        shared = DivisorTable(self.max_primes)
+        shared.attach(memory, len(self.primes), self.limit)
+        return shared
+
+    def attach(self, memory, count, limit):
+        """Read the count primes in memory, a table up to limit, in place."""
+        view = memory.buf[:self.primes.itemsize * count].cast('I')
+        self.memory = memory
+        self.primes = view.toreadonly()
+        view.release()
+        self.limit = limit
+
+    def __getstate__(self):
+        if not isinstance(self.primes, memoryview):
+            return self.__dict__ | {"memory": None}  # A private table.
+        return {"max_primes": self.max_primes, "name": self.memory.name,
+                "count": len(self.primes), "limit": self.limit}
+
+    def __setstate__(self, state):
+        if "name" not in state:
+            self.__dict__.update(state)
+            return
+
+        self.__init__(state["max_primes"])
+        memory = shared_memory.SharedMemory(name=state["name"])
+        self.attach(memory, state["count"], state["limit"])
+
+    def close(self):
+        if self.memory is not None:
+            if isinstance(self.primes, memoryview):
+                self.primes.release()
+            self.memory.close()
+
+    def unlink(self):
+        if self.memory is not None:
+            self.memory.unlink()
@@ -0,0 +1,101 @@
+import math
+import random
+from array import array
+from typing import Optional
+from step_09.primality import SMALL_PRIMES, is_prime_fast
+from step_09.segmented_sieve import SegmentedSieve
+
+
+class Factorizer:
+    """Integer factorization.
+
+    Numbers below spf_limit are split with a smallest-prime-factor table.
+    Above it, small primes are divided out and the rest is split with
+    Pollard-Brent rho until the fast primality test accepts each part.
+    """
+
+    SPF_LIMIT = 1 << 22  # 16 MiB table.
+    RHO_BATCH = 128      # Steps between gcds in Pollard-Brent.
+
+    def __init__(self, spf_limit=SPF_LIMIT):
+        self.spf_limit = spf_limit
+        self.spf = self.build_spf_table(spf_limit)
+
+    def build_spf_table(self, limit):
+        """spf[n] is the smallest prime factor of composite n, 0 for primes.
+
+        Primes are struck out in descending order, so the smallest prime
+        factor is the last value written to each entry.
+        """
+        spf = array('I', [0]) * limit
+        sieve = SegmentedSieve()
+        base_primes = list(sieve.primes_between(2, math.isqrt(limit - 1) + 1))
+        for p in reversed(base_primes):
+            count = len(range(p * p, limit, p))
+            spf[p * p::p] = array('I', [p]) * count
+        return spf
+
+    def factor(self, num):
+        """Prime factors of num > 0, smallest first, with multiplicity."""
+        factors = []
+        for p in SMALL_PRIMES:
+            while num % p == 0 and num >= self.spf_limit:
+                factors.append(p)
+                num //= p
+
+        self.split(num, factors)
+        return sorted(factors)
+
+    def split(self, num, factors):
+        while num >= self.spf_limit:
+            if is_prime_fast(num):
+                factors.append(num)
+                return
+            divisor = self.pollard_brent(num)
+            self.split(divisor, factors)
+            num //= divisor
+
+        while num > 1:
+            p = self.spf[num] or num
+            factors.append(p)
+            num //= p
+
+    def pollard_brent(self, num):
+        """A non-trivial divisor of the odd composite num."""
+        while True:
+            y = random.randrange(1, num)
+            c = random.randrange(1, num)
+            g = r = q = 1
+            while g == 1:
+                x = y
+                for _ in range(r):
+                    y = (y * y + c) % num
+                k = 0
+                while k < r and g == 1:
+                    saved_y = y
+                    for _ in range(min(self.RHO_BATCH, r - k)):
+                        y = (y * y + c) % num
+                        q = q * abs(x - y) % num
+                    g = math.gcd(q, num)
+                    k += self.RHO_BATCH
+                r *= 2
+
+            if g == num:  # Overshot: step back one at a time.
+                g = 1
+                while g == 1:
+                    saved_y = (saved_y * saved_y + c) % num
+                    g = math.gcd(abs(x - saved_y), num)
+
+            if g != num:
+                return g
+
+
+worker_factorizer: Optional[Factorizer] = None  # One per pool process.
+
+
+def factorize(num, spf_limit=Factorizer.SPF_LIMIT):
+    """Runs in a pool worker: the prime factors of num."""
+    global worker_factorizer
+    if worker_factorizer is None or worker_factorizer.spf_limit != spf_limit:
+        worker_factorizer = Factorizer(spf_limit)
+    return worker_factorizer.factor(num)
@@ -1,5 +1,14 @@
 from typing import Optional
 from multiprocessing import Value
+from step_09.prime_store import PrimeStore
+from step_09.prime_ring import PrimeRing
+from step_09.seqlock import SeqLockValue
+from step_09.governor import SearchGovernor
+from step_09.divisor_table import DivisorTable
 
-prime: Optional[Value] = None
+prime: Optional[SeqLockValue] = None  # Latest prime found.
 running: Optional[Value] = None
+store: Optional[PrimeStore] = None
+ring: Optional[PrimeRing] = None
+governor: Optional[SearchGovernor] = None
+divisors: Optional[DivisorTable] = None  # Read-only, in shared memory.
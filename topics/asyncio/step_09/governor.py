@@ -0,0 +1,70 @@
+from enum import Enum
+from step_09.seqlock import SeqLockTuple
+
+
+class GovernorMode(Enum):
+    FULL_SPEED = 1
+    PRIMES_PER_SECOND = 2
+    DUTY_CYCLE = 3  # Fraction of the time spent searching.
+
+
+class SearchGovernor:
+    """Paces the prime search.
+
+    The mode and target live in shared memory, so the server process can
+    change them while the search runs in a pool worker. They are
+    published together through a seqlock, so the search never pairs a
+    new mode with an old target.
+    """
+
+    MIN_SLEEP = 0.005  # Shorter pauses are saved up rather than slept.
+    SLEEP_SLICE = 0.1  # Longest sleep, so a stop is seen soon.
+
+    def __init__(self, mode=GovernorMode.PRIMES_PER_SECOND, target=1.0):
+        self.setting = SeqLockTuple('d', (mode.value, target))
+        self.owed = 0.0  # Pause time saved up, per process.
+
+    def set(self, mode, target=0.0):
+        """Only the server process may set the mode."""
+        self.setting.write((mode.value, target))
+        self.owed = 0.0
+
+    def get_setting(self):
+        """(mode, target), as last set."""
+        mode, target = self.setting.read()
+        return GovernorMode(int(mode)), target
+
+    def get_mode(self):
+        return self.get_setting()[0]
+
+    def get_target(self):
+        return self.get_setting()[1]
+
+    def delay(self, busy_time, primes=1):
+        """Seconds to pause after spending busy_time finding primes."""
+        mode, target = self.get_setting()
+        if target <= 0:
+            pause = 0.0
+        elif mode == GovernorMode.PRIMES_PER_SECOND:
+            pause = primes / target - busy_time
+        elif mode == GovernorMode.DUTY_CYCLE:
+            pause = busy_time * (1 - target) / target
+        else:
+            pause = 0.0
+
+        self.owed = max(self.owed + pause, 0.0)
+        if self.owed < self.MIN_SLEEP:
+            return 0.0
+        pause, self.owed = self.owed, 0.0
+        return pause
+
+    def get_sleeps(self, busy_time, primes=1):
+        """The pause after busy_time, as sleeps of at most SLEEP_SLICE.
+
+        Callers check between sleeps whether the search should stop.
+        """
+        pause = self.delay(busy_time, primes)
+        while pause > 0:
+            sleep = min(pause, self.SLEEP_SLICE)
+            yield sleep
+            pause -= sleep
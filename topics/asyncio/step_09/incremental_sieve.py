@@ -0,0 +1,71 @@
+from step_09.wheel import WHEEL_GAPS, WHEEL_PRIMES, wheel_position
+
+
+class IncrementalSieve:
+    """Unbounded Sieve of Eratosthenes that remembers its composites.
+
+    Walks the mod-210 wheel. For each base prime p found so far, the
+    multiples table maps p's next composite on the wheel to p and the
+    wheel index of its cofactor. A candidate missing from the table is
+    prime. Hitting an entry moves it on to p's next multiple, so each
+    candidate costs about one dict lookup, whatever its size.
+
+    A base prime only joins the table once the walk reaches its square,
+    and the base primes come from a second, lazily made IncrementalSieve.
+    The table therefore holds about pi(sqrt n) entries.
+    """
+
+    def __init__(self):
+        self.multiples = {}  # Next composite => (prime, cofactor index).
+        self.base = None     # IncrementalSieve for the base primes.
+
+    def primes_after(self, start):
+        """Yield every prime greater than start, forever.
+
+        Each call starts a new walk, so use one generator per sieve.
+        """
+        self.multiples = {}
+        self.base = None
+        for p in WHEEL_PRIMES:
+            if p > start:
+                yield p
+
+        num, index = wheel_position(max(start + 1, 11))
+        base_primes = self.base_primes()
+        prime = next(base_primes)
+        while prime * prime < num:  # Resuming: catch up the base primes.
+            cofactor, cofactor_index = wheel_position(max(prime,
+                                                          -(-num // prime)))
+            self.add(prime * cofactor, prime, cofactor_index)
+            prime = next(base_primes)
+        square = prime * prime
+
+        multiples = self.multiples
+        while True:
+            entry = multiples.pop(num, None)
+            if entry is not None:
+                self.add_next(num, *entry)
+            elif num < square:
+                yield num
+            else:  # num is the square of the next base prime.
+                self.add_next(num, prime, wheel_position(prime)[1])
+                prime = next(base_primes)
+                square = prime * prime
+            num += WHEEL_GAPS[index]
+            index = (index + 1) % len(WHEEL_GAPS)
+
+    def base_primes(self):
+        yield 11  # Everything up to 11 * 11 on the wheel is prime.
+        self.base = IncrementalSieve()
+        yield from self.base.primes_after(11)
+
+    def add_next(self, composite, prime, index):
+        """Move prime on to its next multiple after composite."""
+        self.add(composite + prime * WHEEL_GAPS[index], prime,
+                 (index + 1) % len(WHEEL_GAPS))
+
+    def add(self, composite, prime, index):
+        while composite in self.multiples:  # Taken by another prime.
+            composite += prime * WHEEL_GAPS[index]
+            index = (index + 1) % len(WHEEL_GAPS)
+        self.multiples[composite] = (prime, index)
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import time
+from collections import deque
+from step_09 import globals
+from step_09.checkpoint import Checkpointer
+from step_09.prime_store import PrimeStore
+from step_09.segmented_sieve import sieve_range
+from step_09.governor import GovernorMode, SearchGovernor
+
+
+def search_range(low, high, pack):
+    """Runs in a pool worker: the primes in [low, high), and if pack,
+    their bits for the store (see PrimeStore.pack_primes)."""
+    primes = sieve_range(low, high)
+    packed = None
+    if pack and len(primes) > 0:
+        packed = PrimeStore.pack_primes(primes)
+    return primes, packed
+
+
+class ParallelPrimeSearch:
+    """Sieves consecutive ranges of the number line on a process pool.
+
+    Ranges are handed out in order and their results are merged in the
+    same order, so the published prime only ever moves forward. With a
+    store, the workers also pack their primes into store bits, and the
+    merge only ORs the bytes in.
+    """
+
+    RANGE_SIZE = 1 << 21    # Numbers sieved by one pool job.
+    JOBS_PER_WORKER = 2     # Keeps each worker busy while we merge.
+
+    def __init__(self, pool, workers=None, start=3, store=None,
+                 governor=None, checkpointer=None):
+        self.pool = pool
+        self.checkpointer = checkpointer  # Optional Checkpointer.
+        self.governor = governor or SearchGovernor(GovernorMode.FULL_SPEED)
+        self.workers = workers or os.cpu_count()
+        self.store = store  # Optional PrimeStore to record into.
+        if store is not None:
+            start = max(start, store.highest_prime())
+        self.next_low = start + 1
+        self.latest = start
+        self.primes_found = 0
+
+    def get_state(self):
+        """Same keys as PrimeCalculator, so either can resume the other."""
+        return {
+            "current_prime": self.latest,
+            "primes_found": self.primes_found,
+        }
+
+    def restore_state(self, state):
+        if Checkpointer.can_resume(state, self.latest, self.store):
+            self.latest = state["current_prime"]
+            self.next_low = self.latest + 1
+        self.primes_found = state.get("primes_found", 0)
+
+    async def run(self, limit=None):
+        print(f"Searching primes on {self.workers} workers...")
+        loop = asyncio.get_running_loop()
+        pending = deque()
+
+        try:
+            while self.is_searching(limit, pending):
+                start = time.perf_counter()
+                self.fill_pipeline(loop, pending, limit)
+                primes, packed = await pending.popleft()
+                self.merge(primes, packed)
+                await self.pace(time.perf_counter() - start, len(primes))
+                self.checkpoint_if_due()
+        finally:
+            self.cancel_pending(pending)
+            self.save_checkpoint()
+
+        print("Searching primes: STOPPED.", flush=True)
+
+    def is_searching(self, limit, pending):
+        if globals.running.value != 1:
+            return False
+        return limit is None or self.next_low < limit or len(pending) > 0
+
+    def fill_pipeline(self, loop, pending, limit):
+        while len(pending) < self.workers * self.JOBS_PER_WORKER:
+            if limit is not None and self.next_low >= limit:
+                break
+            low, high = self.next_range(limit)
+            pending.append(loop.run_in_executor(
+                self.pool, search_range, low, high, self.store is not None))
+
+    def next_range(self, limit):
+        low = self.next_low
+        high = low + self.RANGE_SIZE
+        if limit is not None:
+            high = min(high, limit)
+        self.next_low = high
+        return low, high
+
+    def merge(self, primes, packed):
+        if len(primes) > 0:
+            self.primes_found += len(primes)
+            self.latest = primes[-1]
+            if self.store is not None:
+                self.store.record_bits(*packed, self.latest)
+            if globals.ring is not None:
+                globals.ring.append_all(primes)
+            self.update_global()
+
+    def checkpoint_if_due(self):
+        if self.checkpointer is not None:
+            self.checkpointer.save_search_if_due(self.get_state, self.store)
+
+    def save_checkpoint(self):
+        if self.checkpointer is not None:
+            self.checkpointer.save_search(self.get_state(), self.store)
+
+    async def pace(self, busy_time, primes):
+        for sleep in self.governor.get_sleeps(busy_time, primes):
+            if globals.running.value != 1:
+                break
+            await asyncio.sleep(sleep)
+
+    def update_global(self):
+        globals.prime.write(self.latest)
+
+    def cancel_pending(self, pending):
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,144 @@
+import math
+
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37,
+                41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+# (limit, bases): testing against these bases is deterministic for n < limit.
+MILLER_RABIN_BASES = (
+    (2047, SMALL_PRIMES[:1]),
+    (1373653, SMALL_PRIMES[:2]),
+    (25326001, SMALL_PRIMES[:3]),
+    (3215031751, SMALL_PRIMES[:4]),
+    (2152302898747, SMALL_PRIMES[:5]),
+    (3474749660383, SMALL_PRIMES[:6]),
+    (341550071728321, SMALL_PRIMES[:7]),
+    (3825123056546413051, SMALL_PRIMES[:9]),
+    (2 ** 64, SMALL_PRIMES[:12]),
+)
+MILLER_RABIN_LIMIT = MILLER_RABIN_BASES[-1][0]
+
+
+def is_prime_fast(num):
+    """Primality test that does not grow with sqrt(num).
+
+    Deterministic Miller-Rabin below 2^64, Baillie-PSW above it
+    (no known counterexample). Small primes are trial divided first.
+    """
+    if num < 2:
+        return False
+
+    for p in SMALL_PRIMES:
+        if num % p == 0:
+            return num == p
+
+    if num < SMALL_PRIMES[-1] ** 2:
+        return True
+
+    if num < MILLER_RABIN_LIMIT:
+        return all(is_strong_probable_prime(num, base)
+                   for base in miller_rabin_bases(num))
+
+    return is_bpsw_prime(num)
+
+
+def miller_rabin_bases(num):
+    for limit, bases in MILLER_RABIN_BASES:
+        if num < limit:
+            return bases
+
+
+def is_strong_probable_prime(num, base):
+    """Miller-Rabin round: is odd num a strong probable prime to base?"""
+    d = num - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    x = pow(base, d, num)
+    if x == 1 or x == num - 1:
+        return True
+
+    for _ in range(s - 1):
+        x = x * x % num
+        if x == num - 1:
+            return True
+
+    return False
+
+
+def is_bpsw_prime(num):
+    """Baillie-PSW: strong base-2 test followed by a strong Lucas test."""
+    if not is_strong_probable_prime(num, 2):
+        return False
+
+    if math.isqrt(num) ** 2 == num:
+        return False
+
+    d, p, q = selfridge_parameters(num)
+    if d is None:
+        return False  # num shares a factor with d.
+
+    return is_strong_lucas_probable_prime(num, d, p, q)
+
+
+def selfridge_parameters(num):
+    """Find D in 5, -7, 9, -11, ... with Jacobi(D/num) == -1."""
+    d = 5
+    while True:
+        j = jacobi(d, num)
+        if j == -1:
+            return d, 1, (1 - d) // 4
+        if j == 0 and abs(d) != num:
+            return None, None, None
+        d = -d - 2 if d > 0 else -d + 2
+
+
+def jacobi(a, n):
+    a %= n
+    result = 1
+    while a != 0:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def is_strong_lucas_probable_prime(num, d, p, q):
+    k = num + 1
+    s = 0
+    while k % 2 == 0:
+        k //= 2
+        s += 1
+
+    u, v, qk = lucas_sequence(num, k, d, p, q)
+    if u == 0 or v == 0:
+        return True
+
+    for _ in range(s - 1):
+        v = (v * v - 2 * qk) % num
+        if v == 0:
+            return True
+        qk = qk * qk % num
+
+    return False
+
+
+def lucas_sequence(num, k, d, p, q):
+    """Return (U_k, V_k, Q^k) modulo num, by binary expansion of k."""
+    u, v, qk = 1, p % num, q % num
+    half = (num + 1) // 2  # Inverse of 2 modulo odd num.
+
+    for bit in bin(k)[3:]:
+        u, v = u * v % num, (v * v - 2 * qk) % num
+        qk = qk * qk % num
+        if bit == '1':
+            u, v = (p * u + v) * half % num, (d * u + p * v) * half % num
+            qk = qk * q % num
+
+    return u, v, qk
@@ -2,8 +2,10 @@
 
 # Async prime server example: cleaned up
 #
+import argparse
 import logging
 import asyncio
+import os
 import signal
 import time
 
@@ -11,32 +13,95 @@ from concurrent.futures import ProcessPoolExecutor
 from multiprocessing import Value
 from typing import Optional
 from step_09 import PrimeServerAsync
+from step_09 import PrimeServerProtocol
+from step_09 import PrimeServerStreams
 from step_09 import PrimeCalculator
+from step_09 import BACKENDS
+from step_09 import ParallelPrimeSearch
+from step_09 import PrimeStore
+from step_09 import PrimeRing
+from step_09 import SeqLockValue
+from step_09 import SearchGovernor
+from step_09 import GovernorMode
+from step_09 import DivisorTable
+from step_09 import Checkpointer
 from step_09 import globals
+from step_09.prime_feed import SLOW_CONSUMER_POLICIES, DROP_OLDEST
 
 server: Optional[PrimeServerAsync] = None
+resume_state: Optional[dict] = None  # From the newest valid checkpoint.
+
+SEARCH_BACKEND = "sieve"  # Default for --backend.
+SERVER_MODE = "coroutine"  # Default for --server.
+FEED_POLICY = DROP_OLDEST  # Default for --slow-subscribers.
+PARALLEL_SEARCH = False  # Set by --parallel: sieve ranges on every worker.
+SEARCH_WORKERS = os.cpu_count()  # Default for --workers.
+STORE_PATH = "primes.store"  # Primes found so far, kept across restarts.
+QUERY_WORKERS = 2  # Processes for CPU-bound client queries.
+SHARED_DIVISOR_LIMIT = 1 << 16  # Shared divisors cover numbers below 2^32.
+CHECKPOINT_DIR = "checkpoints"  # Search state, saved every few seconds.
+
+# Server mode => server class. All answer the same commands.
+SERVERS = {
+    "coroutine": PrimeServerAsync,   # A coroutine per client, on sockets.
+    "protocol": PrimeServerProtocol,  # asyncio.Protocol callbacks.
+    "streams": PrimeServerStreams,    # Streams, with drain() backpressure.
+}
 
 
 class PrimeApp:
 
     def init(self):
+        self.open_prime_store()
         self.init_shares()
+        self.restore_checkpoint()
         self.create_prime_server()
         self.add_interrupt_handler()
 
     def init_shares(self):
-        globals.prime = Value('i', 0)  # We declare an integer with value zero.
-        # We declare an integer with value zero.
+        # Latest prime, lock-free. A prebuilt store (see build_store.py)
+        # makes it valid from the start.
+        globals.prime = SeqLockValue('Q', globals.store.highest_prime())
         globals.running = Value('B', 1)
+        globals.ring = PrimeRing()  # Recent primes, shared with the pool.
+        globals.governor = self.create_governor()
+        globals.divisors = self.create_shared_divisors()
+
+    def create_shared_divisors(self):
+        divisors = DivisorTable()
+        divisors.ensure(SHARED_DIVISOR_LIMIT)
+        return divisors.share()
+
+    def create_governor(self):
+        if PARALLEL_SEARCH:
+            return SearchGovernor(GovernorMode.FULL_SPEED)
+        return SearchGovernor(GovernorMode.PRIMES_PER_SECOND, 1.0)
+
+    def open_prime_store(self):
+        globals.store = PrimeStore(STORE_PATH).open(writable=True)
+
+    def restore_checkpoint(self):
+        global resume_state
+        resume_state = Checkpointer(CHECKPOINT_DIR).load_latest()
+        if resume_state is not None:
+            print(f"Resuming after {resume_state['current_prime']}.")
 
     def create_prime_server(self):
         global server
-        server = PrimeServerAsync()
+        server = SERVERS[SERVER_MODE](globals.store)
+        server.set_feed_policy(FEED_POLICY)
 
     def add_interrupt_handler(self):
         loop = asyncio.get_running_loop()
         loop.add_signal_handler(signal.SIGINT, self.shutdown)
 
+    def close(self):
+        globals.store.close()
+        globals.ring.close()
+        globals.ring.unlink()
+        globals.divisors.close()
+        globals.divisors.unlink()
+
     def shutdown(self):
         if self.is_running():  # Nothing to do for this process in the pool
             cancel_server()
@@ -45,30 +110,63 @@ class PrimeApp:
         return globals.running.value == 1
 
 
-def run_prime_search(max):
-    prime_calculator = PrimeCalculator()
+def run_prime_search(state):
+    store = PrimeStore(STORE_PATH).open(writable=True)
+    checkpointer = Checkpointer(CHECKPOINT_DIR)
+    prime_calculator = PrimeCalculator(SEARCH_BACKEND, store=store,
+                                       governor=globals.governor,
+                                       divisors=globals.divisors,
+                                       checkpointer=checkpointer)
+    if state is not None:
+        prime_calculator.restore_state(state)
     prime_calculator.run()
+    store.close()
 
 
 async def run_prime_task(pool):
     loop = asyncio.get_running_loop()
-    await loop.run_in_executor(pool, run_prime_search, 60)
+    await loop.run_in_executor(pool, run_prime_search, resume_state)
+
+
+async def run_parallel_prime_task(pool):
+    search = ParallelPrimeSearch(pool, SEARCH_WORKERS, store=globals.store,
+                                 governor=globals.governor,
+                                 checkpointer=Checkpointer(CHECKPOINT_DIR))
+    if resume_state is not None:
+        search.restore_state(resume_state)
+    await search.run()
 
 
 def create_prime_task(pool):
-    return asyncio.create_task(run_prime_task(pool), name="task_prime")
+    if PARALLEL_SEARCH:
+        coroutine = run_parallel_prime_task(pool)
+    else:
+        coroutine = run_prime_task(pool)
+    return asyncio.create_task(coroutine, name="task_prime")
+
+
+def get_pool_size():
+    return SEARCH_WORKERS if PARALLEL_SEARCH else 1
 
 
-def copy_globals_to_process(shared_prime, shared_running):
+def copy_globals_to_process(shared_prime, shared_running, shared_ring,
+                            shared_governor, shared_divisors):
     globals.prime = shared_prime
     globals.running = shared_running
+    globals.ring = shared_ring
+    globals.governor = shared_governor
+    globals.divisors = shared_divisors
 
 
 async def run_server():
     global server
     with ProcessPoolExecutor(initializer=copy_globals_to_process,
-                             initargs=(globals.prime, globals.running),
-                             max_workers=1) as pool:
+                             initargs=(globals.prime, globals.running,
+                                       globals.ring, globals.governor,
+                                       globals.divisors),
+                             max_workers=get_pool_size()) as pool, \
+            ProcessPoolExecutor(max_workers=QUERY_WORKERS) as query_pool:
+        server.set_query_pool(query_pool)
         prime_task = create_prime_task(pool)
         server_task = server.run()
         await asyncio.gather(prime_task, server_task)
@@ -109,6 +207,34 @@ def cancel_server():
     cancel_all(tasks)
 
 
+def parse_args():
+    global SEARCH_BACKEND, SERVER_MODE, FEED_POLICY
+    global PARALLEL_SEARCH, SEARCH_WORKERS
+    parser = argparse.ArgumentParser(description="Prime number server.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        default=SEARCH_BACKEND,
+                        help="how the search finds primes")
+    parser.add_argument("--server", choices=sorted(SERVERS),
+                        default=SERVER_MODE,
+                        help="how the server handles its clients")
+    parser.add_argument("--slow-subscribers", choices=SLOW_CONSUMER_POLICIES,
+                        default=FEED_POLICY,
+                        help="what happens when a subscriber falls behind")
+    parser.add_argument("--parallel", action="store_true",
+                        help="sieve ranges on all workers at full speed"
+                             " (--backend is then ignored)")
+    parser.add_argument("--workers", type=int, default=SEARCH_WORKERS,
+                        help="search processes for --parallel")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    SEARCH_BACKEND = args.backend
+    SERVER_MODE = args.server
+    FEED_POLICY = args.slow_subscribers
+    PARALLEL_SEARCH = args.parallel
+    SEARCH_WORKERS = args.workers
+
+
 async def main():
 
     app = PrimeApp()
@@ -125,7 +251,10 @@ async def main():
         logging.exception(e)
         print("Terminated.")
 
+    app.close()
+
     # That's it for now!
 
 if __name__ == "__main__":
+    parse_args()
     asyncio.run(main())
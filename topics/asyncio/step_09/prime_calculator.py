@@ -1,48 +1,109 @@
 from step_09 import globals
+from step_09.backends import create_backend
+from step_09.checkpoint import Checkpointer
+from step_09.governor import SearchGovernor
+from step_09.incremental_sieve import IncrementalSieve
 import time
 
 
 class PrimeCalculator:
+    """Runs the prime search with a backend chosen by name.
 
-    def __init__(self):
+    See backends.BACKENDS for the names.
+    """
+
+    def __init__(self, backend="trial", store=None, governor=None,
+                 divisors=None, checkpointer=None):
         self.current_prime = 3
+        self.primes_found = 0
+        self.search_time = 0.0  # Seconds spent searching, pauses excluded.
+        self.backend = create_backend(backend, divisors)
+        self.backend_state = None  # From a checkpoint, for the backend.
+        self.primes = None  # Iterator over the backend, made on demand.
+        self.governor = governor or SearchGovernor()  # One prime a second.
+        self.store = store  # Optional PrimeStore to record into.
+        self.checkpointer = checkpointer  # Optional Checkpointer.
+        self.resume_from_store()
+
+    def resume_from_store(self):
+        if self.store is not None:
+            self.current_prime = max(self.current_prime,
+                                     self.store.highest_prime())
+
+    def get_state(self):
+        """What a checkpoint needs to resume the search."""
+        state = {
+            "current_prime": self.current_prime,
+            "primes_found": self.primes_found,
+            "search_time": self.search_time,
+        }
+        state.update(self.backend.get_state())
+        return state
+
+    def restore_state(self, state):
+        if Checkpointer.can_resume(state, self.current_prime, self.store):
+            self.current_prime = state["current_prime"]
+            self.backend_state = state
+        self.primes_found = state.get("primes_found", 0)
+        self.search_time = state.get("search_time", 0.0)
 
     def run(self):
-        print("Searching primes...")
+        print(f"Searching primes ({self.backend.name})...")
 
         while (globals.running.value == 1):
-            time.sleep(1)
+            start = time.perf_counter()
             self.set_next_prime()
+            busy_time = time.perf_counter() - start
+            self.search_time += busy_time
+            self.checkpoint_if_due()
+            self.pace(busy_time)
 
+        self.save_checkpoint()
         print("Searching primes: STOPPED.", flush=True)
 
-    def find_next(self):
-        num = self.current_prime
-        found = False
+    def pace(self, busy_time):
+        for sleep in self.governor.get_sleeps(busy_time):
+            if globals.running.value != 1:
+                break
+            time.sleep(sleep)
 
-        while (not found):
-            num = num + 2
-            if self.is_prime(num):
-                found = True
-                self.current_prime = num
+    def checkpoint_if_due(self):
+        if self.checkpointer is not None:
+            self.checkpointer.save_search_if_due(self.get_state, self.store)
 
+    def save_checkpoint(self):
+        if self.checkpointer is not None:
+            self.checkpointer.save_search(self.get_state(), self.store)
+
+    def find_next(self):
+        if self.primes is None:
+            self.primes = self.backend.primes_after(self.current_prime,
+                                                    self.backend_state)
+        self.current_prime = next(self.primes)
+        self.primes_found += 1
         self.update_global()
 
+    def generate_primes(self, start=None):
+        """Yield the primes after start (default: the latest), forever.
+
+        Runs its own incremental sieve, apart from the search.
+        """
+        if start is None:
+            start = self.get_latest()
+        yield from IncrementalSieve().primes_after(start)
+
     def is_prime(self, num):
-        found_prime = True
-        max_divisor = int(num ** 0.5) + 1
-        for i in range(3, max_divisor):
-            if (num % i == 0):
-                found_prime = False
-                break
-        return found_prime
+        return self.backend.is_prime(num)
 
     def get_latest(self):
         return self.current_prime
 
     def update_global(self):
-        with globals.prime.get_lock():
-            globals.prime.value = self.get_latest()
+        if self.store is not None:
+            self.store.record(self.get_latest())
+        if globals.ring is not None:
+            globals.ring.append(self.get_latest())
+        globals.prime.write(self.get_latest())
 
     def set_next_prime(self):
         self.find_next()
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from step_09 import globals
+
+DROP_OLDEST = "drop-oldest"  # A full queue loses its oldest update.
+COALESCE = "coalesce"        # A full queue is replaced by the newest update.
+DISCONNECT = "disconnect"    # A client whose queue fills is disconnected.
+SLOW_CONSUMER_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+
+class Subscriber:
+    """A subscribed client: its queue of updates and the task sending them.
+
+    Each update is (data, published): the encoded push, shared with the
+    other subscribers, and when the feed published it.
+    """
+
+    def __init__(self, feed, replies):
+        self.feed = feed
+        self.replies = replies
+        self.queue = deque()
+        self.ready = asyncio.Event()  # Set while the queue has updates.
+        self.task = asyncio.create_task(self.run(), name="task_subscriber")
+
+    def offer(self, data, published):
+        """Queue an update without waiting, as the feed's policy says."""
+        if len(self.queue) >= self.feed.queue_size:
+            self.feed.dropped += 1
+            if self.feed.policy == DISCONNECT:
+                self.feed.unsubscribe(self.replies)
+                self.replies.close()
+                return
+            if self.feed.policy == COALESCE:
+                self.feed.dropped += len(self.queue) - 1
+                self.queue.clear()
+            else:
+                self.queue.popleft()
+
+        self.queue.append((data, published))
+        self.ready.set()
+
+    async def run(self):
+        try:
+            while True:
+                await self.ready.wait()
+                data, published = self.queue.popleft()
+                if not self.queue:
+                    self.ready.clear()
+                await self.replies.write_all(data)
+                self.feed.latencies.append(time.monotonic() - published)
+
+        except (OSError, RuntimeError) as e:
+            logging.info("Dropping subscriber: %s", e)
+            self.feed.unsubscribe(self.replies)
+
+    def stop(self):
+        self.task.cancel()
+
+
+class PrimeFeed:
+    """Broadcasts each new prime to the subscribed clients.
+
+    The search runs in another process, so the feed polls the shared
+    ring every INTERVAL seconds, and pushes what was added since as
+    (sequence number, prime) pairs. Sequence numbers go up by one per
+    prime: a jump tells a client that primes were missed.
+
+    Each update is encoded once per protocol, and the same bytes go to
+    every subscriber of that protocol. Publishing only queues them:
+    each subscriber has its own bounded queue and task to send it, so a
+    slow client only holds itself up. When a queue is full the policy
+    decides (see SLOW_CONSUMER_POLICIES). The time from publishing an
+    update to writing it to each client is kept for latency reports.
+    """
+
+    INTERVAL = 0.01
+    QUEUE_SIZE = 64          # Updates queued per subscriber.
+    LATENCY_SAMPLES = 10000  # Latest fan-out latencies kept.
+
+    def __init__(self, interval=INTERVAL, queue_size=QUEUE_SIZE,
+                 policy=DROP_OLDEST):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.policy = policy
+        self.subscribers = {}  # Replies object => Subscriber.
+        self.seq = 0   # Sequence number of the next prime to push.
+        self.task = None
+        self.latencies = deque(maxlen=self.LATENCY_SAMPLES)  # Seconds.
+        self.dropped = 0  # Updates lost to full queues.
+
+    def subscribe(self, replies):
+        """Add a subscriber; returns the first sequence number it gets.
+
+        Subscribing again keeps the subscription and its queue; the
+        number returned is then that of the next update published.
+        """
+        if self.task is None:
+            self.seq = globals.ring.get_head()
+            self.task = asyncio.create_task(self.run(), name="task_feed")
+        if replies not in self.subscribers:
+            self.subscribers[replies] = Subscriber(self, replies)
+        return self.seq
+
+    def unsubscribe(self, replies):
+        subscriber = self.subscribers.pop(replies, None)
+        if subscriber is not None:
+            subscriber.stop()
+
+    async def run(self):
+        try:
+            while self.subscribers:
+                await asyncio.sleep(self.interval)
+                first, primes = globals.ring.read_since(self.seq)
+                if primes:
+                    self.seq = first + len(primes)
+                    self.publish(first, primes)
+        finally:
+            self.task = None
+
+    def publish(self, first, primes):
+        events = [(first + i, prime) for i, prime in enumerate(primes)]
+        published = time.monotonic()
+        encoded = {}  # Replies class => the update in its encoding.
+        for replies, subscriber in list(self.subscribers.items()):
+            kind = type(replies)
+            if kind not in encoded:
+                encoded[kind] = replies.encode_push(events)
+            subscriber.offer(encoded[kind], published)
+
+    def get_latency_percentiles(self, percents=(50, 90, 99)):
+        """Fan-out latency in seconds at each percent, or {} if none."""
+        if not self.latencies:
+            return {}
+        latencies = sorted(self.latencies)
+        last = len(latencies) - 1
+        return {p: latencies[round(last * p / 100)] for p in percents}
+
+    def report(self):
+        percentiles = self.get_latency_percentiles()
+        if percentiles:
+            text = ", ".join(f"p{p} {seconds * 1000:.2f} ms"
+                             for p, seconds in percentiles.items())
+            print(f"Fan-out latency: {text}; dropped: {self.dropped}.")
+
+    def stop(self):
+        self.report()
+        for replies in list(self.subscribers):
+            self.unsubscribe(replies)
+        if self.task is not None:
+            self.task.cancel()
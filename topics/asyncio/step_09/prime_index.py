@@ -0,0 +1,100 @@
+from array import array
+from bisect import bisect_left
+
+
+class PrimeIndex:
+    """Block index over a PrimeStore for nth-prime and pi(x) queries.
+
+    The store's bitset is cut into blocks of BLOCK_BYTES. counts[b] is
+    the number of primes below block b, so a query is a binary search
+    over counts plus one popcount inside a single block. The index grows
+    with the store as complete blocks appear, but only as far as the
+    queries reach, so a large prebuilt store costs nothing at startup.
+    """
+
+    BLOCK_BYTES = 4096
+    BLOCK_BITS = 8 * BLOCK_BYTES  # Odd numbers per block.
+
+    def __init__(self, store):
+        self.store = store
+        self.counts = array('Q', [1])  # Only 2 lies below block 0.
+
+    def refresh(self, last_block=None):
+        """Add the blocks the store has completed since the last call,
+        up to counts[last_block] when given."""
+        complete_blocks = self.get_covered_bits() // self.BLOCK_BITS
+        if last_block is not None:
+            complete_blocks = min(complete_blocks, last_block)
+        while len(self.counts) <= complete_blocks:
+            self.add_block()
+
+    def add_block(self):
+        """Count the next complete block; False when there is none yet."""
+        block = len(self.counts) - 1
+        if (block + 1) * self.BLOCK_BITS > self.get_covered_bits():
+            return False
+        self.counts.append(self.counts[block] + self.count_bits(block))
+        return True
+
+    def get_covered_bits(self):
+        return (self.store.highest_prime() + 1) // 2
+
+    def bit_index(self, num):
+        """Bit of the largest odd number <= num."""
+        return (num - 1) // 2
+
+    def count_bits(self, block, bits=None):
+        """Set bits among the first bits of block (all of it by default)."""
+        bits = bits or self.BLOCK_BITS
+        start = block * self.BLOCK_BYTES
+        data = self.store.read_bits(start, start + (bits + 7) // 8)
+        value = int.from_bytes(data, 'little') & ((1 << bits) - 1)
+        return value.bit_count()
+
+    def prime_pi(self, num):
+        """Number of primes <= num, or None beyond the store."""
+        if num < 2:
+            return 0
+        if not self.store.covers(num):
+            return None
+
+        block, bit = divmod(self.bit_index(num), self.BLOCK_BITS)
+        self.refresh(block)
+        return self.counts[block] + self.count_bits(block, bit + 1)
+
+    def nth_prime(self, nth):
+        """The nth prime (nth_prime(1) == 2), or None beyond the store."""
+        if nth < 1:
+            return None
+        if nth == 1:
+            return 2
+
+        while self.counts[-1] < nth and self.add_block():
+            pass
+
+        block = bisect_left(self.counts, nth) - 1
+        rank = nth - self.counts[block]
+        if block == len(self.counts) - 1:  # The partly covered last block.
+            bits = self.get_covered_bits() - block * self.BLOCK_BITS
+            if bits <= 0 or self.count_bits(block, bits) < rank:
+                return None
+        return self.find_in_block(block, rank)
+
+    def find_in_block(self, block, rank):
+        """Odd number of the rank-th set bit of block (rank from 1)."""
+        start = block * self.BLOCK_BYTES
+        data = self.store.read_bits(start, start + self.BLOCK_BYTES)
+        for offset, byte in enumerate(data):
+            count = byte.bit_count()
+            if rank <= count:
+                break
+            rank -= count
+
+        for bit in range(8):
+            if byte & (1 << bit):
+                rank -= 1
+                if rank == 0:
+                    break
+
+        index = block * self.BLOCK_BITS + 8 * offset + bit
+        return 2 * index + 1
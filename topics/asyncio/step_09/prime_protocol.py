@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from collections import deque
+from step_09.prime_server_loop import PrimeServerLoop
+from step_09.replies import TextReplies, FrameReplies
+from step_09.wire import FRAME_START, FrameParser
+
+
+class PrimeProtocol(asyncio.Protocol):
+    """One client of a PrimeServerProtocol.
+
+    The event loop calls data_received with whatever has arrived. The
+    commands in it are queued and run in order by a task that only
+    exists while there are commands to run, so an idle client costs no
+    more than its transport. Reading pauses while too many messages
+    are queued, and replies wait while the transport's write buffer is
+    over its high-water mark.
+    """
+
+    MAX_PENDING = 64  # Messages queued before reading pauses.
+
+    def __init__(self, server):
+        self.server = server
+        self.transport: asyncio.Transport = None
+        self.parser = None   # FrameParser, for a binary protocol client.
+        self.replies = None  # Made when the first message shows the protocol.
+        self.pending = deque()  # Per message: (opcode, command, args) list.
+        self.task = None     # Runs the pending commands.
+        self.writable = asyncio.Event()  # Clear while writing is paused.
+        self.writable.set()
+        self.reading = True
+
+    def connection_made(self, transport):
+        self.transport = transport
+        print("Client new: ", transport.get_extra_info('peername'))
+
+    def connection_lost(self, exc):
+        print("Client lost:", self.transport.get_extra_info('peername'))
+        if self.replies is not None:
+            self.server.feed.unsubscribe(self.replies)
+        self.writable.set()  # Don't leave a writer waiting.
+        if self.task is not None:
+            self.task.cancel()
+
+    def data_received(self, data):
+        if self.replies is None:
+            self.choose_protocol(data)
+
+        try:
+            self.pending.append(self.get_commands(data))
+        except ValueError as e:
+            logging.exception(e)
+            self.transport.close()
+            return
+
+        if len(self.pending) >= self.MAX_PENDING:
+            self.pause_reading()
+        if self.task is None:
+            self.task = asyncio.create_task(self.process_pending())
+            self.server.add_task(self.task)
+
+    def choose_protocol(self, data):
+        if data.startswith(FRAME_START):
+            self.parser = FrameParser()
+            self.replies = FrameReplies(self.write, self.transport.close)
+        else:
+            self.replies = TextReplies(self.write, self.transport.close)
+
+    def get_commands(self, data):
+        if self.parser is None:  # Text: one command per message.
+            return [(None, *self.server.get_command(data))]
+
+        self.parser.feed(data)
+        return [(opcode, *self.server.get_frame_command(opcode, args))
+                for opcode, args in self.parser.parse()]
+
+    async def process_pending(self):
+        try:
+            while self.pending:
+                for opcode, cmd, args in self.pending.popleft():
+                    if opcode is not None:
+                        self.replies.begin(opcode)
+                    await self.server.process_command(self.replies, cmd, args)
+                await self.replies.flush()
+                if len(self.pending) < self.MAX_PENDING // 2:
+                    self.resume_reading()
+
+        except Exception as e:
+            logging.exception(e)
+            self.transport.close()
+
+        finally:
+            self.task = None
+
+    def pause_reading(self):
+        if self.reading:
+            self.transport.pause_reading()
+            self.reading = False
+
+    def resume_reading(self):
+        if not self.reading and not self.transport.is_closing():
+            self.transport.resume_reading()
+            self.reading = True
+
+    async def write(self, data):
+        self.transport.write(data)
+        await self.writable.wait()
+
+    def pause_writing(self):
+        self.writable.clear()
+
+    def resume_writing(self):
+        self.writable.set()
+
+
+class PrimeServerProtocol(PrimeServerLoop):
+    """PrimeServerAsync on loop.create_server and PrimeProtocol.
+
+    Commands and replies are the same; only the networking differs. The
+    event loop keeps each client socket registered and calls its
+    protocol back as data arrives, instead of a coroutine per client
+    awaiting sock_recv and sock_sendall.
+    """
+
+    async def start_server(self):
+        return await self.event_loop.create_server(
+            lambda: PrimeProtocol(self), sock=self.server_socket)
@@ -0,0 +1,81 @@
+from multiprocessing import shared_memory
+
+
+class PrimeRing:
+    """Ring buffer of the most recent primes, in shared memory.
+
+    The prime with sequence number seq lives in slot seq % capacity.
+    There is a single writer: it fills the slot first and then moves the
+    head (the next sequence number) on, so appends take no lock. Readers
+    copy a window of slots and then re-read the head to drop any slot
+    that was overwritten while they were copying.
+
+    A ring pickles as its capacity and the name of its shared memory,
+    so a pool process started by spawn or forkserver attaches to the
+    same memory instead of getting a copy.
+    """
+
+    CAPACITY = 4096
+    ITEM_SIZE = 8  # Each slot, and the head, is an unsigned 64-bit int.
+
+    def __init__(self, capacity=CAPACITY, name=None):
+        size = self.ITEM_SIZE * (capacity + 1)
+        self.memory = shared_memory.SharedMemory(
+            name=name, create=name is None, size=size)
+        self.capacity = capacity
+        self.head = self.memory.buf[:self.ITEM_SIZE].cast('Q')
+        self.slots = self.memory.buf[self.ITEM_SIZE:size].cast('Q')
+
+    def __getstate__(self):
+        return self.capacity, self.memory.name
+
+    def __setstate__(self, state):
+        capacity, name = state
+        self.__init__(capacity, name)
+
+    def get_head(self):
+        """Sequence number the next prime will get."""
+        return self.head[0]
+
+    def append(self, prime):
+        seq = self.head[0]
+        self.slots[seq % self.capacity] = prime
+        self.head[0] = seq + 1
+
+    def append_all(self, primes):
+        """Append many primes, moving the head once at the end.
+
+        Until then, readers in other threads or processes could take a
+        slot that was overwritten for one still valid. Only call it
+        where the readers run on the same thread, as ParallelPrimeSearch
+        does on the server's event loop; use append elsewhere.
+        """
+        recent = primes[-self.capacity:]  # Older ones would be overwritten.
+        seq = self.head[0] + len(primes) - len(recent)
+        for prime in recent:
+            self.slots[seq % self.capacity] = prime
+            seq += 1
+        self.head[0] = seq
+
+    def read_since(self, seq):
+        """Return (first, primes): the primes from sequence number first on.
+
+        first is greater than seq when older primes were overwritten.
+        """
+        head = self.head[0]
+        first = max(seq, head - self.capacity, 0)
+        primes = [self.slots[s % self.capacity] for s in range(first, head)]
+
+        oldest_safe = self.head[0] + 1 - self.capacity
+        if oldest_safe > first:
+            del primes[:oldest_safe - first]
+            first = oldest_safe
+        return first, primes
+
+    def close(self):
+        self.head.release()
+        self.slots.release()
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
@@ -1,8 +1,21 @@
 import asyncio
+import functools
 import socket
 import logging
+from collections import deque
 from enum import Enum, auto
+from itertools import islice
 from step_09 import globals
+from step_09.primality import is_prime_fast
+from step_09.prime_index import PrimeIndex
+from step_09.prime_count import COUNT_LIMIT, count_primes
+from step_09.lru_cache import LRUCache
+from step_09.governor import GovernorMode
+from step_09.segmented_sieve import find_primes
+from step_09.factorization import Factorizer, factorize
+from step_09.wire import FRAME_START, FrameParser
+from step_09.replies import TextReplies, FrameReplies
+from step_09.prime_feed import PrimeFeed
 
 
 class ServerEvent(Enum):
@@ -13,9 +26,55 @@ class ServerEvent(Enum):
 class Command(Enum):
     SHUTDOWN_CMD = auto()
     GET_PRIME_CMD = auto()
+    GET_N_CMD = auto()
+    IS_PRIME_CMD = auto()
+    NTH_PRIME_CMD = auto()
+    PRIME_PI_CMD = auto()
+    COUNT_PRIMES_CMD = auto()
+    PRIMES_SINCE_CMD = auto()
+    SET_SPEED_CMD = auto()
+    SET_DUTY_CMD = auto()
+    RANGE_CMD = auto()
+    FACTOR_CMD = auto()
+    SUBSCRIBE_CMD = auto()
     UNKNOWN_CMD = auto()
 
 
+# Command name => (command, number of integer arguments).
+COMMANDS = {
+    b'end': (Command.SHUTDOWN_CMD, 0),
+    b'get': (Command.GET_PRIME_CMD, 0),
+    b'getn': (Command.GET_N_CMD, 1),
+    b'isprime': (Command.IS_PRIME_CMD, 1),
+    b'nth': (Command.NTH_PRIME_CMD, 1),
+    b'pi': (Command.PRIME_PI_CMD, 1),
+    b'count': (Command.COUNT_PRIMES_CMD, 1),
+    b'since': (Command.PRIMES_SINCE_CMD, 1),
+    b'speed': (Command.SET_SPEED_CMD, 1),
+    b'duty': (Command.SET_DUTY_CMD, 1),
+    b'range': (Command.RANGE_CMD, 2),
+    b'factor': (Command.FACTOR_CMD, 1),
+    b'subscribe': (Command.SUBSCRIBE_CMD, 0),
+}
+
+# Frame opcode => command name, for the binary protocol.
+OPCODES = {
+    1: b'end',
+    2: b'get',
+    3: b'isprime',
+    4: b'nth',
+    5: b'pi',
+    6: b'count',
+    7: b'since',
+    8: b'speed',
+    9: b'duty',
+    10: b'range',
+    11: b'factor',
+    12: b'getn',
+    13: b'subscribe',
+}
+
+
 class ServerState(Enum):
     NULL_STATE = auto()
     RUNNING_STATE = auto()
@@ -28,8 +87,22 @@ class PrimeServerAsync:
     BUFFER_LEN = 1024
     PORT_NUM_INDEX = 1
     SELECT_TIMEOUT = 0  # => Non-blocking
-
-    def __init__(self):
+    COUNT_CACHE_SIZE = 1024
+    COUNT_LIMIT = COUNT_LIMIT  # Counting further takes too long.
+    RANGE_CHUNK_PRIMES = 4096  # Primes per sendall when streaming a range.
+    FACTOR_CACHE_SIZE = 1024
+    FACTOR_LIMIT = 2 ** 64  # Bigger numbers may take too long to factor.
+    GET_N_LIMIT = 4096  # Most primes one getn answers with.
+    SPEED_LIMIT = 10 ** 9  # Highest speed target, in primes per second.
+    IS_PRIME_INLINE_LIMIT = 2 ** 64  # Below, tested on the loop at once.
+    IS_PRIME_LIMIT = 2 ** 4096  # From here on, numbers aren't tested.
+    SIEVE_LIMIT = 2 ** 40  # Above, primes in a range are tested one by one.
+    RANGE_LIMIT = 2 ** 64  # Ranges must end by here: testing gets too slow.
+    RANGE_SIEVE_SPAN = 1 << 20  # Numbers per query job when sieving a range.
+    RANGE_TEST_SPAN = 1 << 14   # Numbers per query job when testing.
+    RANGE_JOBS_AHEAD = 2  # Jobs running while the last results are sent.
+
+    def __init__(self, store=None):
         self.HOST = ''     # Symbolic name meaning all available interfaces
         self.PORT = 50007  # Arbitrary non-privileged port
         self.server_socket: socket.socket = None
@@ -37,6 +110,13 @@ class PrimeServerAsync:
         self.state = ServerState.NULL_STATE
         self.event_loop: asyncio.AbstractEventLoop = None
         self.tasks = set()
+        self.store = store  # Optional PrimeStore for historical queries.
+        self.index = PrimeIndex(store) if store is not None else None
+        self.query_pool = None  # Executor for CPU-bound queries.
+        self.counts = LRUCache(self.COUNT_CACHE_SIZE)
+        self.factors = LRUCache(self.FACTOR_CACHE_SIZE)
+        self.spf_limit = Factorizer.SPF_LIMIT  # Table bound for factoring.
+        self.feed = PrimeFeed()  # Pushes new primes to subscribers.
 
     async def run(self):
         self.init()
@@ -70,6 +150,7 @@ class PrimeServerAsync:
     def cancel(self):
         print(f"Interrupt on server (with {len(self.tasks)} tasks).")
         self.close_server_connection()
+        self.feed.stop()
         for task in self.tasks:  # asyncio.all_tasks():
             print(f"Cancelling task ({task.get_name()})")
             task.cancel()  # This should raise an exception in the task.
@@ -82,6 +163,13 @@ class PrimeServerAsync:
         elif (event == ServerEvent.SHUTDOWN_EVT):
             self.state = ServerState.SHUTDOWN_STATE
 
+    def set_query_pool(self, pool):
+        self.query_pool = pool
+
+    def set_feed_policy(self, policy):
+        """What to do with subscribers that fall behind."""
+        self.feed.policy = policy
+
     def add_task(self, task):
         self.tasks.add(task)
         task.add_done_callback(self.tasks.discard)
@@ -111,10 +199,11 @@ class PrimeServerAsync:
 
     async def process_client(self, connection):
         try:
-            is_ok = True
-            while is_ok:
-                data = await self.get_client_data(connection)
-                is_ok = await self.process_client_data(connection, data)
+            data = await self.get_client_data(connection)
+            if data.startswith(FRAME_START):
+                await self.process_frames(connection, data)
+            else:
+                await self.process_messages(connection, data)
 
         except asyncio.CancelledError:
             print("Client processing cancelled.")
@@ -129,17 +218,67 @@ class PrimeServerAsync:
     async def get_client_data(self, connection):
         return await self.event_loop.sock_recv(connection, self.BUFFER_LEN)
 
+    def get_writer(self, connection):
+        """Coroutine function that sends bytes to the client."""
+        return functools.partial(self.event_loop.sock_sendall, connection)
+
+    def get_closer(self, connection):
+        """Function that disconnects the client.
+
+        The socket is shut down rather than closed, so that the client's
+        coroutine sees the end of the data and finishes as usual.
+        """
+        return functools.partial(self.shutdown_connection, connection)
+
+    def shutdown_connection(self, connection):
+        try:
+            connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already gone.
+
     def get_port_number(self, connection):
         return connection.getpeername()[self.PORT_NUM_INDEX]
 
-    async def process_client_data(self, connection, data):
+    async def process_messages(self, connection, data):
+        """Text protocol: one command per message."""
+        replies = TextReplies(self.get_writer(connection),
+                              self.get_closer(connection))
+        try:
+            while await self.process_client_data(connection, replies, data):
+                data = await self.get_client_data(connection)
+        finally:
+            self.feed.unsubscribe(replies)
+
+    async def process_frames(self, connection, data):
+        """Binary protocol: any number of frames per message.
+
+        The replies to all the frames in a message are sent together.
+        """
+        parser = FrameParser()
+        replies = FrameReplies(self.get_writer(connection),
+                               self.get_closer(connection))
+        try:
+            while data:
+                parser.feed(data)
+                for opcode, args in parser.parse():
+                    replies.begin(opcode)
+                    cmd, args = self.get_frame_command(opcode, args)
+                    await self.process_command(replies, cmd, args)
+                await replies.flush()
+                data = await self.get_client_data(connection)
+        finally:
+            self.feed.unsubscribe(replies)
+
+        self.report_lost_client(connection)
+
+    async def process_client_data(self, connection, replies, data):
         if not data:
             self.report_lost_client(connection)
             self.close_connection(connection)
 
             return False  # => Lost the client
         else:
-            await self.process_data(connection, data)
+            await self.process_data(replies, data)
 
         return True
 
@@ -150,28 +289,71 @@ class PrimeServerAsync:
         client_port = self.get_port_number(connection)
         print(f"Client lost: ({client_port})")
 
-    async def process_data(self, connection, data):
-        cmd = self.get_command(data)
-        await self.process_command(connection, cmd)
+    async def process_data(self, replies, data):
+        cmd, args = self.get_command(data)
+        await self.process_command(replies, cmd, args)
 
     def get_command(self, msg):
-        if (msg == b'end'):
-            cmd = Command.SHUTDOWN_CMD
-        elif (msg == b'get'):
-            cmd = Command.GET_PRIME_CMD
-        else:
+        """Split msg into a command and its integer arguments."""
+        name, *words = msg.split() or [b'']
+        try:
+            args = [int(word) for word in words]
+        except ValueError:
+            return Command.UNKNOWN_CMD, []
+        return self.lookup_command(name, args)
+
+    def get_frame_command(self, opcode, args):
+        return self.lookup_command(OPCODES.get(opcode, b''), args)
+
+    def lookup_command(self, name, args):
+        cmd, arg_count = COMMANDS.get(name, (Command.UNKNOWN_CMD, 0))
+        if len(args) != arg_count:
             cmd = Command.UNKNOWN_CMD
-        return cmd
+        return cmd, args
 
-    async def process_command(self, connection, cmd):
+    async def process_command(self, replies, cmd, args):
         if (cmd == Command.SHUTDOWN_CMD):
             self.close_server_connection()
 
         elif (cmd == Command.GET_PRIME_CMD):
-            await self.send_client_prime(connection)
+            await self.send_client_prime(replies)
+
+        elif (cmd == Command.GET_N_CMD):
+            await self.send_client_recent_primes(replies, *args)
+
+        elif (cmd == Command.IS_PRIME_CMD):
+            await self.send_client_is_prime(replies, *args)
+
+        elif (cmd == Command.NTH_PRIME_CMD):
+            await self.send_client_nth_prime(replies, *args)
+
+        elif (cmd == Command.PRIME_PI_CMD):
+            await self.send_client_prime_pi(replies, *args)
+
+        elif (cmd == Command.COUNT_PRIMES_CMD):
+            await self.send_client_prime_count(replies, *args)
+
+        elif (cmd == Command.PRIMES_SINCE_CMD):
+            await self.send_client_primes_since(replies, *args)
+
+        elif (cmd == Command.RANGE_CMD):
+            await self.send_client_range(replies, *args)
+
+        elif (cmd == Command.FACTOR_CMD):
+            await self.send_client_factors(replies, *args)
+
+        elif (cmd == Command.SUBSCRIBE_CMD):
+            await self.subscribe_client(replies)
+
+        elif (cmd == Command.SET_SPEED_CMD):
+            await self.set_search_speed(replies, *args)
+
+        elif (cmd == Command.SET_DUTY_CMD):
+            await self.set_search_duty(replies, *args)
 
         elif (cmd == Command.UNKNOWN_CMD):
             print("Client sent unknown command!")
+            await replies.send_error()
         else:
             print("Command type not recognised!")
 
@@ -182,10 +364,195 @@ class PrimeServerAsync:
     def close_server_socket(self):
         self.server_socket.close()
 
-    async def send_client_prime(self, connection):
+    async def send_client_prime(self, replies):
         # global prime
-        await self.send_val_to_client(connection, globals.prime.value)
+        await self.send_val_to_client(replies, globals.prime.read())
+
+    async def send_client_recent_primes(self, replies, count):
+        """Send how many primes follow, then the count latest, oldest first.
+
+        The shared ring has the latest primes; the store has older ones.
+        """
+        count = min(count, self.GET_N_LIMIT)
+        primes = []
+        if globals.ring is not None and count > 0:
+            seq = globals.ring.get_head() - count
+            _, primes = globals.ring.read_since(seq)
+        if len(primes) < count and self.index is not None:
+            primes = self.get_stored_primes(count)
+        await self.send_vals_to_client(replies, [len(primes), *primes])
+
+    def get_stored_primes(self, count):
+        """The count highest primes in the store."""
+        highest = self.store.highest_prime()
+        total = self.index.prime_pi(highest)
+        first = self.index.nth_prime(max(total - count + 1, 1))
+        return list(self.store.primes_between(first, highest + 1))
+
+    async def send_client_is_prime(self, replies, num):
+        """Big numbers are tested in a query process, up to a limit."""
+        found_prime = None
+        if self.store is not None:
+            found_prime = self.store.is_prime(num)  # From the mapped file.
+        if found_prime is None:
+            if num >= self.IS_PRIME_LIMIT:
+                return await replies.send_error()
+            if num < self.IS_PRIME_INLINE_LIMIT:
+                found_prime = is_prime_fast(num)
+            else:
+                found_prime = await self.event_loop.run_in_executor(
+                    self.query_pool, is_prime_fast, num)
+        await self.send_val_to_client(replies, int(found_prime))
+
+    async def send_client_nth_prime(self, replies, nth):
+        prime = None
+        if self.index is not None:
+            prime = self.index.nth_prime(nth)
+        await self.send_val_to_client(replies, prime or 0)
+
+    async def send_client_prime_pi(self, replies, num):
+        count = None
+        if self.index is not None:
+            count = self.index.prime_pi(num)
+        await self.send_val_to_client(replies, count or 0)
+
+    async def send_client_prime_count(self, replies, num):
+        count = await self.count_primes(num)
+        if count is None:
+            return await replies.send_error()
+        await self.send_val_to_client(replies, count)
+
+    async def count_primes(self, num):
+        """pi(num) from the index, the cache, or a query process.
+
+        None when num is past the index and above COUNT_LIMIT.
+        """
+        count = None
+        if self.index is not None:
+            count = self.index.prime_pi(num)
+        if count is None and num > self.COUNT_LIMIT:
+            return None
+        if count is None:
+            count = self.counts.get(num)
+        if count is None:
+            count = await self.event_loop.run_in_executor(
+                self.query_pool, count_primes, num)
+            self.counts.put(num, count)
+        return count
+
+    async def send_client_primes_since(self, replies, seq):
+        """Send first sequence number, count, then the primes."""
+        first, primes = seq, []
+        if globals.ring is not None:
+            first, primes = globals.ring.read_since(seq)
+        await self.send_vals_to_client(replies,
+                                       [first, len(primes), *primes])
+
+    async def send_client_range(self, replies, low, high):
+        """Stream the primes in [low, high), then a 0 to end the range.
+
+        Only a chunk or so is held at a time, and sending waits until
+        the client has taken it, so a slow reader slows the stream down
+        rather than making the server buffer the range.
+        """
+        if high > self.RANGE_LIMIT:
+            return await replies.send_error()
+
+        chunk = []
+        async for primes in self.primes_between(low, high):
+            chunk.extend(primes)
+            while len(chunk) >= self.RANGE_CHUNK_PRIMES:
+                await self.send_vals_to_client(
+                    replies, chunk[:self.RANGE_CHUNK_PRIMES])
+                del chunk[:self.RANGE_CHUNK_PRIMES]
+                await asyncio.sleep(0)  # Let other clients in.
+
+        chunk.append(0)
+        await self.send_vals_to_client(replies, chunk)
+
+    async def primes_between(self, low, high):
+        """Yield the primes in [low, high) a batch at a time.
+
+        The stored part is read from the store; the rest is found in the
+        query pool, a few spans ahead of the one being sent.
+        """
+        stored_high = low
+        if self.store is not None:
+            stored_high = min(high, self.store.highest_prime() + 1)
+            stored = self.store.primes_between(low, stored_high)
+            while batch := list(islice(stored, self.RANGE_CHUNK_PRIMES)):
+                yield batch
+
+        jobs = deque()
+        try:
+            for span_low, span_high in self.get_range_spans(
+                    max(low, stored_high), high):
+                jobs.append(self.event_loop.run_in_executor(
+                    self.query_pool, find_primes, span_low, span_high,
+                    self.SIEVE_LIMIT))
+                if len(jobs) > self.RANGE_JOBS_AHEAD:
+                    yield await jobs.popleft()
+            while jobs:
+                yield await jobs.popleft()
+        finally:
+            for job in jobs:
+                job.cancel()
+
+    def get_range_spans(self, low, high):
+        """Split [low, high) into query jobs, none across SIEVE_LIMIT."""
+        while low < high:
+            if low < self.SIEVE_LIMIT:
+                span_high = min(low + self.RANGE_SIEVE_SPAN, self.SIEVE_LIMIT)
+            else:
+                span_high = low + self.RANGE_TEST_SPAN
+            span_high = min(span_high, high)
+            yield low, span_high
+            low = span_high
+
+    async def send_client_factors(self, replies, num):
+        """Send the number of prime factors, then the factors."""
+        factors = []
+        if 0 < num < self.FACTOR_LIMIT:
+            factors = await self.factor(num)
+        await self.send_vals_to_client(replies, [len(factors), *factors])
+
+    async def factor(self, num):
+        factors = self.factors.get(num)
+        if factors is None:
+            factors = await self.event_loop.run_in_executor(
+                self.query_pool, factorize, num, self.spf_limit)
+            self.factors.put(num, factors)
+        return factors
+
+    async def subscribe_client(self, replies):
+        """Reply with the first sequence number to come; pushes follow."""
+        if globals.ring is None:
+            return await replies.send_error()
+        await self.send_val_to_client(replies, self.feed.subscribe(replies))
+
+    async def set_search_speed(self, replies, primes_per_second):
+        """Admin: 0 => full speed, else a target rate. Replies 1 if set."""
+        if globals.governor is None or \
+                not 0 <= primes_per_second <= self.SPEED_LIMIT:
+            return await self.send_val_to_client(replies, 0)
+
+        if primes_per_second == 0:
+            globals.governor.set(GovernorMode.FULL_SPEED)
+        else:
+            globals.governor.set(GovernorMode.PRIMES_PER_SECOND,
+                                 primes_per_second)
+        await self.send_val_to_client(replies, 1)
+
+    async def set_search_duty(self, replies, percent):
+        """Admin: search for percent % of the time. Replies 1 if set."""
+        if globals.governor is None or not 0 < percent <= 100:
+            return await self.send_val_to_client(replies, 0)
+
+        globals.governor.set(GovernorMode.DUTY_CYCLE, percent / 100)
+        await self.send_val_to_client(replies, 1)
+
+    async def send_vals_to_client(self, replies, vals):
+        await replies.send(vals)
 
-    async def send_val_to_client(self, connection, val):
-        data = val.to_bytes(4, byteorder='big')
-        await self.event_loop.sock_sendall(connection, data)
+    async def send_val_to_client(self, replies, val):
+        await replies.send([val])
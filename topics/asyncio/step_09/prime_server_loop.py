@@ -0,0 +1,34 @@
+import asyncio
+from step_09.prime_server_async import PrimeServerAsync
+
+
+class PrimeServerLoop(PrimeServerAsync):
+    """PrimeServerAsync on an asyncio.Server, which accepts the clients.
+
+    Subclasses implement start_server, handing the listening socket to
+    the event loop. The server then runs until close_server_socket.
+    """
+
+    def __init__(self, store=None):
+        super().__init__(store)
+        self.server: asyncio.Server = None
+        self.closed = None  # Future, done when the server is closed.
+
+    async def run_networking(self):
+        print("Listening ...")
+        self.closed = self.event_loop.create_future()
+        self.server = await self.start_server()
+        await self.closed
+        print("Listening off.")
+
+    async def start_server(self):
+        """Return an asyncio.Server serving self.server_socket."""
+        raise NotImplementedError
+
+    def close_server_socket(self):
+        if self.server is not None:
+            self.server.close()
+        else:
+            self.server_socket.close()
+        if self.closed is not None and not self.closed.done():
+            self.closed.set_result(None)
@@ -0,0 +1,173 @@
+import mmap
+import os
+import struct
+
+TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+
+
+def pack_bits(flags):
+    """One byte per odd number => one bit each, bit 0 first."""
+    digits = flags.translate(TO_DIGITS)[::-1]
+    return int(digits, 2).to_bytes(len(flags) // 8, 'little')
+
+
+class PrimeStore:
+    """Discovered primes kept on disk as a memory-mapped odd-only bitset.
+
+    Bit i of the data stands for the odd number 2 * i + 1. The header
+    holds the highest prime recorded: every number up to it is covered,
+    because primes are recorded in increasing order. Readers look bits up
+    in the mapped pages directly; nothing is loaded into the heap.
+    """
+
+    MAGIC = b'PRIMEBS1'
+    HEADER = struct.Struct('>8sQ')  # Magic, highest prime recorded.
+    GROW_BYTES = 1 << 20  # The file grows in steps of 8M odd numbers.
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.map: mmap.mmap = None
+        self.writable = False
+
+    def open(self, writable=False):
+        self.writable = writable
+        if writable and not os.path.exists(self.path):
+            self.create()
+
+        mode = 'r+b' if writable else 'rb'
+        self.file = open(self.path, mode)
+        self.map_file()
+
+        magic, _ = self.HEADER.unpack_from(self.map, 0)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a prime store.")
+        return self
+
+    def create(self):
+        with open(self.path, 'wb') as file:
+            file.write(self.HEADER.pack(self.MAGIC, 1))
+            file.truncate(self.HEADER.size + self.GROW_BYTES)
+        self.open(writable=True)
+        self.record(3)  # The first odd prime, where searches start.
+        self.close()
+
+    def map_file(self):
+        access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+        self.map = mmap.mmap(self.file.fileno(), 0, access=access)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def flush(self):
+        """Write the recorded primes through to the file."""
+        if self.writable and self.map is not None:
+            self.map.flush()
+
+    def remap(self, size=None):
+        self.map.close()
+        if size is not None:
+            self.file.truncate(size)
+        self.map_file()
+
+    def highest_prime(self):
+        _, highest = self.HEADER.unpack_from(self.map, 0)
+        return highest
+
+    def set_highest_prime(self, prime):
+        self.HEADER.pack_into(self.map, 0, self.MAGIC, prime)
+
+    def record(self, prime):
+        """Record the next prime found; primes must arrive in order."""
+        self.set_bit(prime)
+        self.set_highest_prime(prime)
+
+    def record_all(self, primes):
+        if len(primes) > 0:
+            self.record_bits(*self.pack_primes(primes), primes[-1])
+
+    @classmethod
+    def pack_primes(cls, primes):
+        """The bitset bytes that hold the odd primes given, in order.
+
+        Returns (index of the first byte, bytes), for record_bits. Needs
+        no open store, so pool workers can pack what they found.
+        """
+        first_byte = primes[0] // 16
+        base = 8 * first_byte
+        flags = bytearray(primes[-1] // 2 - base + 1)
+        for prime in primes:
+            flags[prime // 2 - base] = 1
+        flags.extend(bytes(-len(flags) % 8))
+        return first_byte, pack_bits(flags)
+
+    def record_bits(self, first_byte, bits, highest):
+        """Set the bits from pack_primes, and record highest as the last."""
+        start = self.HEADER.size + first_byte
+        end = start + len(bits)
+        if end > len(self.map):
+            self.grow(end - 1)
+        old = int.from_bytes(self.map[start:end], 'little')
+        new = old | int.from_bytes(bits, 'little')  # Ranges share edge bytes.
+        self.map[start:end] = new.to_bytes(len(bits), 'little')
+        self.set_highest_prime(highest)
+
+    def set_bit(self, prime):
+        offset, mask = self.locate(prime)
+        if offset >= len(self.map):
+            self.grow(offset)
+        self.map[offset] |= mask
+
+    def grow(self, offset):
+        steps = (offset - self.HEADER.size) // self.GROW_BYTES + 1
+        self.remap(self.HEADER.size + steps * self.GROW_BYTES)
+
+    def locate(self, num):
+        index = num // 2
+        return self.HEADER.size + index // 8, 1 << (index % 8)
+
+    def covers(self, num):
+        return num <= self.highest_prime()
+
+    def is_prime(self, num):
+        """Look num up in the store: None when it is beyond the store."""
+        if not self.covers(num):
+            return None
+        if num < 3 or num % 2 == 0:
+            return num == 2
+
+        self.ensure_mapped(num)
+        offset, mask = self.locate(num)
+        return self.map[offset] & mask != 0
+
+    def ensure_mapped(self, num):
+        offset, _ = self.locate(num)
+        if offset >= len(self.map):
+            self.remap()  # Another process has grown the file.
+
+    def read_bits(self, start_byte, end_byte):
+        """Bytes [start_byte, end_byte) of the bitset, bit 0 first."""
+        self.ensure_mapped(16 * (end_byte - 1) + 1)  # Last number in range.
+        base = self.HEADER.size
+        return self.map[base + start_byte:base + end_byte]
+
+    def primes_between(self, low, high):
+        """Yield the stored primes p with low <= p < high."""
+        high = min(high, self.highest_prime() + 1)
+        if low <= 2 < high:
+            yield 2
+
+        num = max(low, 3) | 1
+        if num < high:
+            self.ensure_mapped(high - 1)
+        while num < high:
+            offset, mask = self.locate(num)
+            if self.map[offset] & mask:
+                yield num
+            num += 2
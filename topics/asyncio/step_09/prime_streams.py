@@ -0,0 +1,64 @@
+import asyncio
+from step_09.prime_server_loop import PrimeServerLoop
+
+
+class StreamConnection:
+    """A client's StreamReader and StreamWriter, used where the coroutine
+    server uses a socket."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def getpeername(self):
+        return self.writer.get_extra_info('peername')
+
+    def close(self):
+        self.writer.close()
+
+    def shutdown(self, how):
+        self.writer.close()  # The reader then sees the end of the data.
+
+
+class PrimeServerStreams(PrimeServerLoop):
+    """PrimeServerAsync on asyncio.start_server streams.
+
+    Commands and replies are the same. Every write is followed by
+    drain(), which returns at once while the transport's write buffer
+    is below high_water, and otherwise waits until the client has read
+    it down to low_water. A client that stops reading therefore stops
+    its own replies instead of making the server buffer them, however
+    long they are.
+    """
+
+    HIGH_WATER = 64 * 1024  # Bytes buffered before writing waits.
+    LOW_WATER = 16 * 1024   # Writing goes on once the buffer is down to this.
+
+    def __init__(self, store=None, high_water=HIGH_WATER,
+                 low_water=LOW_WATER):
+        super().__init__(store)
+        self.high_water = high_water
+        self.low_water = low_water
+
+    async def start_server(self):
+        return await asyncio.start_server(self.process_streams,
+                                          sock=self.server_socket)
+
+    async def process_streams(self, reader, writer):
+        self.add_task(asyncio.current_task())
+        writer.transport.set_write_buffer_limits(high=self.high_water,
+                                                 low=self.low_water)
+        connection = StreamConnection(reader, writer)
+        print("Client new: ", connection.getpeername())
+        await self.process_client(connection)
+
+    async def get_client_data(self, connection):
+        return await connection.reader.read(self.BUFFER_LEN)
+
+    def get_writer(self, connection):
+        writer = connection.writer
+
+        async def write(data):
+            writer.write(data)
+            await writer.drain()
+        return write
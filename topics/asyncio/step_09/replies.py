@@ -0,0 +1,73 @@
+import asyncio
+from step_09.wire import encode_frame, encode_ints
+
+
+class TextReplies:
+    """Replies for a text protocol client: each one is sent at once.
+
+    write is a coroutine function that sends bytes to the client, and
+    returns when the server may go on writing; close disconnects the
+    client. Replies and pushes to subscribers take turns, so neither is
+    cut into by the other.
+    """
+
+    def __init__(self, write, close):
+        self.write = write
+        self.close = close
+        self.lock = asyncio.Lock()
+
+    async def send(self, vals):
+        await self.write_all(encode_ints(vals))
+
+    def encode_push(self, events):
+        """(sequence number, prime) pairs, as pushed to a subscriber."""
+        return encode_ints([val for event in events for val in event])
+
+    async def write_all(self, data):
+        async with self.lock:
+            await self.write(data)
+
+    async def send_error(self):
+        pass  # The text protocol has no error replies.
+
+    async def flush(self):
+        pass
+
+
+class FrameReplies(TextReplies):
+    """Replies for a binary protocol client, one frame per reply.
+
+    Frames are buffered, so the answers to a batch of pipelined commands
+    go out in one write when the batch is done; a long reply is sent
+    on whenever FLUSH_BYTES have built up.
+    """
+
+    FLUSH_BYTES = 64 * 1024
+    ERROR_OPCODE = 0xFF  # Reply to a command the server can't run.
+    PUSH_OPCODE = 13     # Pushed to subscribers: the subscribe opcode.
+
+    def __init__(self, write, close):
+        super().__init__(write, close)
+        self.buffer = bytearray()
+        self.opcode = 0  # Of the command being answered.
+
+    def begin(self, opcode):
+        self.opcode = opcode
+
+    async def send(self, vals):
+        self.buffer += encode_frame(self.opcode, vals)
+        if len(self.buffer) >= self.FLUSH_BYTES:
+            await self.flush()
+
+    def encode_push(self, events):
+        return b''.join(encode_frame(self.PUSH_OPCODE, event)
+                        for event in events)
+
+    async def send_error(self):
+        self.buffer += encode_frame(self.ERROR_OPCODE, [])
+
+    async def flush(self):
+        if self.buffer:
+            data = bytes(self.buffer)
+            self.buffer.clear()
+            await self.write_all(data)
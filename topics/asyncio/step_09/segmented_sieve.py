@@ -0,0 +1,126 @@
+import math
+from array import array
+from itertools import compress
+from typing import Optional
+from step_09.primality import is_prime_fast
+from step_09.wheel import WHEEL_PRIMES, WheelCandidates, odd_wheel_flags
+
+
+class SegmentedSieve:
+    """Segmented Sieve of Eratosthenes.
+
+    Only odd numbers are stored: byte i of a segment stands for the
+    number low + 2 * i. Segments are kept small enough to stay in the
+    L1/L2 cache while their multiples are struck out. Each segment starts
+    from the mod-210 wheel pattern, so 3, 5 and 7 are never struck.
+    """
+
+    SEGMENT_SIZE = 32 * 1024  # Odd numbers per segment (one byte each).
+
+    def __init__(self, segment_size=SEGMENT_SIZE):
+        self.segment_size = segment_size
+        self.base_primes = []  # Odd primes used to strike out multiples.
+        self.base_limit = 1    # All odd primes <= base_limit are known.
+        self.cursor = None     # Low end of the segment primes_after is in.
+
+    def primes_after(self, start, low=None):
+        """Yield every prime greater than start, forever.
+
+        low, if given, is where the first segment starts, so that a
+        resumed search keeps its segment boundaries.
+        """
+        if start < 2:
+            yield 2
+
+        low = self.first_odd_above(start) if low is None else low
+        while True:
+            self.cursor = low
+            high = low + 2 * self.segment_size
+            for prime in self.sieve_segment(low, high):
+                if prime > start:
+                    yield prime
+            low = high
+
+    def primes_between(self, low, high):
+        """Yield the primes p with low <= p < high."""
+        if low <= 2 < high:
+            yield 2
+
+        low = self.first_odd_above(low - 1)
+        while low < high:
+            segment_high = min(low + 2 * self.segment_size, high)
+            yield from self.sieve_segment(low, segment_high)
+            low = low + 2 * self.segment_size
+
+    def first_odd_above(self, num):
+        return max(num + 1, 3) | 1
+
+    def sieve_segment(self, low, high):
+        """Return an iterator over the odd primes in [low, high), low odd."""
+        return compress(range(low, high, 2), self.segment_flags(low, high))
+
+    def segment_flags(self, low, high):
+        """One byte per odd number in [low, high), low odd: 1 for primes.
+
+        Also 1 for the number 1, when low is 1.
+        """
+        size = (high - low + 1) // 2
+        flags = odd_wheel_flags(low, size)
+        self.ensure_base_primes(math.isqrt(high - 1))
+
+        for p in self.base_primes[len(WHEEL_PRIMES) - 1:]:
+            square = p * p
+            if square >= high:
+                break
+            start = max(square, self.first_odd_multiple(p, low))
+            index = (start - low) // 2
+            if index < size:
+                count = (size - 1 - index) // p + 1
+                flags[index::p] = bytes(count)
+
+        return flags
+
+    def first_odd_multiple(self, p, low):
+        multiple = -(-low // p) * p
+        if multiple % 2 == 0:
+            multiple += p
+        return multiple
+
+    def ensure_base_primes(self, limit):
+        if limit <= self.base_limit:
+            return
+
+        limit = max(limit, 2 * self.base_limit)  # Grow geometrically.
+        flags = bytearray(b'\x01') * (limit + 1)
+        flags[0:2] = b'\x00\x00'
+        for i in range(2, math.isqrt(limit) + 1):
+            if flags[i]:
+                flags[i * i::i] = bytes(len(range(i * i, limit + 1, i)))
+
+        self.base_primes = list(compress(range(3, limit + 1, 2), flags[3::2]))
+        self.base_limit = limit
+
+
+worker_sieve: Optional[SegmentedSieve] = None  # One per pool process.
+
+
+def sieve_range(low, high):
+    """Runs in a pool worker: return the primes in [low, high).
+
+    The worker's sieve, and so its base primes, are kept between calls.
+    """
+    global worker_sieve
+    if worker_sieve is None:
+        worker_sieve = SegmentedSieve()
+    return array('Q', worker_sieve.primes_between(low, high))
+
+
+def find_primes(low, high, sieve_limit):
+    """Runs in a pool worker: the primes in [low, high).
+
+    Ranges up to sieve_limit are sieved; above it the base primes would
+    cost too much, so the candidates are tested one by one.
+    """
+    if high <= sieve_limit:
+        return sieve_range(low, high)
+    return list(filter(is_prime_fast, WheelCandidates(low - 1, high)))
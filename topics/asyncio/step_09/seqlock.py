@@ -0,0 +1,60 @@
+from multiprocessing.sharedctypes import RawArray, RawValue
+
+
+class SeqLockValue:
+    """A value published by one writer process and read without locks.
+
+    The writer bumps the version to an odd number, stores the payload and
+    bumps the version back to even. A reader accepts the payload only if
+    it saw the same even version before and after reading it. Readers
+    never block: after READ_ATTEMPTS torn reads they return the last
+    value they read successfully.
+    """
+
+    READ_ATTEMPTS = 64
+
+    def __init__(self, typecode='Q', value=0):
+        self.version = RawValue('Q', 0)
+        self.payload = self.create_payload(typecode, value)
+        self.last_read = value  # Per process, never shared.
+
+    def create_payload(self, typecode, value):
+        return RawValue(typecode, value)
+
+    def load(self):
+        return self.payload.value
+
+    def store(self, value):
+        self.payload.value = value
+
+    def write(self, value):
+        """Only one process may write."""
+        self.version.value += 1  # Odd: write in progress.
+        self.store(value)
+        self.version.value += 1
+
+    def read(self):
+        for _ in range(self.READ_ATTEMPTS):
+            before = self.version.value
+            if before % 2 == 0:
+                value = self.load()
+                if self.version.value == before:
+                    self.last_read = value
+                    return value
+        return self.last_read
+
+
+class SeqLockTuple(SeqLockValue):
+    """Several values of one type, written and read as a whole."""
+
+    def __init__(self, typecode='d', values=(0.0,)):
+        super().__init__(typecode, tuple(values))
+
+    def create_payload(self, typecode, value):
+        return RawArray(typecode, value)
+
+    def load(self):
+        return tuple(self.payload)
+
+    def store(self, value):
+        self.payload[:] = value
@@ -0,0 +1,71 @@
+import math
+from bisect import bisect_left
+
+WHEEL_PRIMES = (2, 3, 5, 7)
+WHEEL_SIZE = 2 * 3 * 5 * 7  # 210
+
+# The 48 residues modulo 210 that are coprime to 2, 3, 5 and 7.
+WHEEL_OFFSETS = tuple(r for r in range(1, WHEEL_SIZE)
+                      if math.gcd(r, WHEEL_SIZE) == 1)
+WHEEL_GAPS = tuple(b - a for a, b in
+                   zip(WHEEL_OFFSETS, WHEEL_OFFSETS[1:] + (WHEEL_SIZE + 1,)))
+
+# One byte per odd number over a full turn: 0 for multiples of 3, 5 or 7.
+ODD_WHEEL_PATTERN = bytes(1 if math.gcd(2 * k + 1, WHEEL_SIZE) == 1 else 0
+                          for k in range(WHEEL_SIZE // 2))
+
+
+class WheelCandidates:
+    """Prime candidates in (start, stop) from a mod-210 wheel.
+
+    Yields the wheel primes 2, 3, 5 and 7, then only the numbers coprime
+    to 210, which skips about 77% of the number line. Each call to iter()
+    starts again from the beginning.
+    """
+
+    def __init__(self, start, stop=None):
+        self.start = start
+        self.stop = stop
+
+    def __iter__(self):
+        for p in WHEEL_PRIMES:
+            if p > self.start and self.is_before_stop(p):
+                yield p
+
+        num, index = wheel_position(max(self.start + 1, 11))
+        while self.is_before_stop(num):
+            yield num
+            num += WHEEL_GAPS[index]
+            index = (index + 1) % len(WHEEL_GAPS)
+
+    def is_before_stop(self, num):
+        return self.stop is None or num < self.stop
+
+
+def wheel_position(num):
+    """The first number >= num that is coprime to 210, and its index in
+    WHEEL_OFFSETS. Step on from there with WHEEL_GAPS[index].
+    """
+    turn, residue = divmod(num, WHEEL_SIZE)
+    index = bisect_left(WHEEL_OFFSETS, residue)
+    if index == len(WHEEL_OFFSETS):
+        turn, index = turn + 1, 0
+    return turn * WHEEL_SIZE + WHEEL_OFFSETS[index], index
+
+
+def odd_wheel_flags(low, size):
+    """Flags for the odd numbers low, low + 2, ... with multiples of 3, 5
+    and 7 already cleared. A sieve segment starts from these instead of
+    striking out the three smallest odd primes itself.
+    """
+    period = len(ODD_WHEEL_PATTERN)
+    shift = (low // 2) % period
+    turn = ODD_WHEEL_PATTERN[shift:] + ODD_WHEEL_PATTERN[:shift]
+    flags = bytearray(turn * (size // period + 1))
+    del flags[size:]
+
+    for p in WHEEL_PRIMES[1:]:
+        if low <= p < low + 2 * size:
+            flags[(p - low) // 2] = 1
+
+    return flags
@@ -0,0 +1,104 @@
+"""Integers on the wire.
+
+A value below 2^31 is sent as 4 big-endian bytes, as it always was.
+A larger value starts with 4 bytes that have the top bit set and hold,
+in the low 31 bits, the number of bytes that follow; those bytes are
+the value, big-endian. Values are never negative.
+
+The binary protocol sends frames: a 4 byte big-endian length, then that
+many bytes holding a 1 byte opcode and the opcode's integers. As frame
+lengths are below 2^24, a frame always starts with a 0 byte, which no
+text command does.
+"""
+
+HEADER_LENGTH = 4
+LONG_FLAG = 1 << 31  # Set in the header of a long value.
+FRAME_START = b'\x00'  # First byte of every frame.
+MAX_FRAME_LENGTH = 1 << 20  # For frames sent to the server.
+
+
+def encode_int(val):
+    if val < LONG_FLAG:
+        return val.to_bytes(HEADER_LENGTH, byteorder='big')
+
+    length = (val.bit_length() + 7) // 8
+    return ((LONG_FLAG | length).to_bytes(HEADER_LENGTH, byteorder='big')
+            + val.to_bytes(length, byteorder='big'))
+
+
+def encode_ints(vals):
+    return b''.join(encode_int(val) for val in vals)
+
+
+def decode_int(data, offset=0):
+    """Value at data[offset:] and the offset after it.
+
+    Raises ValueError if data ends within the value.
+    """
+    end = offset + HEADER_LENGTH
+    val = int.from_bytes(data[offset:end], byteorder='big')
+    if end > len(data):
+        raise ValueError("Integer cut short.")
+    if val < LONG_FLAG:
+        return val, end
+
+    offset, end = end, end + (val ^ LONG_FLAG)
+    if end > len(data):
+        raise ValueError("Integer cut short.")
+    return int.from_bytes(data[offset:end], byteorder='big'), end
+
+
+def decode_ints(data):
+    vals, offset = [], 0
+    while offset < len(data):
+        val, offset = decode_int(data, offset)
+        vals.append(val)
+    return vals
+
+
+def read_int(recv_exactly):
+    """Read one value with recv_exactly(length), which returns bytes."""
+    val = int.from_bytes(recv_exactly(HEADER_LENGTH), byteorder='big')
+    if val < LONG_FLAG:
+        return val
+    return int.from_bytes(recv_exactly(val ^ LONG_FLAG), byteorder='big')
+
+
+def encode_frame(opcode, vals):
+    payload = encode_ints(vals)
+    length = 1 + len(payload)
+    return length.to_bytes(HEADER_LENGTH, byteorder='big') + \
+        bytes([opcode]) + payload
+
+
+class FrameParser:
+    """Splits a byte stream into frames, however it was cut up.
+
+    Bytes are fed in as they arrive; parse() returns every complete
+    frame so far and keeps the start of an incomplete one for later.
+    """
+
+    def __init__(self, max_length=MAX_FRAME_LENGTH):
+        self.max_length = max_length
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer += data
+
+    def parse(self):
+        """List of (opcode, integers) for the complete frames."""
+        frames, offset = [], 0
+        while len(self.buffer) - offset >= HEADER_LENGTH:
+            start = offset + HEADER_LENGTH
+            length = int.from_bytes(self.buffer[offset:start], 'big')
+            if not 0 < length <= self.max_length:
+                raise ValueError(f"Bad frame length: {length}.")
+            if start + length > len(self.buffer):
+                break
+
+            payload = bytes(self.buffer[start + 1:start + length])
+            frames.append((self.buffer[start], decode_ints(payload)))
+            offset = start + length
+
+        del self.buffer[:offset]
+        return frames